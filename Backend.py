@@ -0,0 +1,89 @@
+import os
+
+# -------------------------------------------------------------------------- #
+#
+# Arithmetic backend for the field and scalar math of ECDSA.py and Schnorr.py
+#
+# The environment variable CORSO_BITCOIN_BACKEND selects it:
+# -"gmpy2": use gmpy2 (mpz numbers, invert, powmod), error if it's missing
+# -"python": plain Python ints, pow and % (no extra dependency)
+# -not set: gmpy2 if it can be imported, otherwise plain Python ints
+#
+# gmpy2 older than GMPY2_MIN_VERSION counts as missing. Whatever the backend,
+# invert() returns a plain int and raises ValueError when x isn't invertible,
+# like pow(x, -1, modulus).
+#
+# -------------------------------------------------------------------------- #
+
+BACKEND_ENV_VAR = "CORSO_BITCOIN_BACKEND"
+BACKEND_GMPY2 = "gmpy2"
+BACKEND_PYTHON = "python"
+GMPY2_MIN_VERSION = (2, 2)
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+def gmpy2_version() -> tuple:
+    """Version of the installed gmpy2 as a tuple of ints, e.g. (2, 2, 1) (empty if it's missing)"""
+    if gmpy2 is None:
+        return ()
+    numbers = []
+    for part in gmpy2.version().split("."):
+        digits = "".join(c for c in part if c.isdigit())
+        if not digits:
+            break
+        numbers.append(int(digits))
+        if len(digits) != len(part):
+            # pre-release suffix, e.g. "2.2.0a1"
+            break
+    return tuple(numbers)
+
+
+def gmpy2_usable() -> bool:
+    """True if gmpy2 is installed and recent enough"""
+    return gmpy2 is not None and gmpy2_version() >= GMPY2_MIN_VERSION
+
+
+def select_backend(requested: str = None) -> str:
+    """Return the name of the backend to use, given the requested one (None -> the best available)"""
+    if not requested:
+        return BACKEND_GMPY2 if gmpy2_usable() else BACKEND_PYTHON
+    requested = requested.lower()
+    if requested not in (BACKEND_GMPY2, BACKEND_PYTHON):
+        raise ValueError(f"{BACKEND_ENV_VAR} must be '{BACKEND_GMPY2}' or '{BACKEND_PYTHON}', not '{requested}'")
+    if requested == BACKEND_GMPY2 and gmpy2 is None:
+        raise ImportError(f"{BACKEND_ENV_VAR}={BACKEND_GMPY2} but gmpy2 is not installed")
+    if requested == BACKEND_GMPY2 and not gmpy2_usable():
+        minimum = ".".join(map(str, GMPY2_MIN_VERSION))
+        raise ImportError(f"{BACKEND_ENV_VAR}={BACKEND_GMPY2} needs gmpy2 >= {minimum}, found {gmpy2.version()}")
+    return requested
+
+
+BACKEND = select_backend(os.environ.get(BACKEND_ENV_VAR))
+
+if BACKEND == BACKEND_GMPY2:
+    mpz = gmpy2.mpz
+
+    def invert(x, modulus):
+        """Inverse of x mod modulus (a plain int)"""
+        try:
+            return int(gmpy2.invert(x, modulus))
+        except ZeroDivisionError:
+            raise ValueError("base is not invertible for the given modulus")
+
+    def powmod(x, e, modulus):
+        """x^e mod modulus"""
+        return gmpy2.powmod(x, e, modulus)
+else:
+    mpz = int
+
+    def invert(x, modulus):
+        """Inverse of x mod modulus"""
+        return pow(x, -1, modulus)
+
+    def powmod(x, e, modulus):
+        """x^e mod modulus"""
+        return pow(x, e, modulus)
@@ -1,6 +1,22 @@
 # module for CSPRNG
 import secrets
+import os
+import sys
+import mmap
+import struct
+from hashlib import sha256
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from Tools import int_from_bytes, bytes_from_int
+# field and scalar arithmetic: gmpy2 if available, plain Python ints otherwise (see Backend.py)
+from Backend import mpz, invert, powmod
+from Point import Point
+# optional NumPy batch arithmetic for multiply_many(..., vectorized=True), numpy imported only on first use
+import NumpyField
+# opt-in counters of the hot paths (see Instrumentation.py)
+import Instrumentation
 
 # -------------------------
 # Elliptic Curve Parameters
@@ -20,12 +36,85 @@ n = 1157920892373161954235709850086879078528375642790749043826051631415181614943
 G = 55066263022277343669578718895168534326250603453777594175500187360389116729240,\
     32670510020758816978083085130507043184471273380659243275938904335757337482424
 
+# endomorphism of the curve: LAMBDA * (x, y) = (BETA * x, y) for every point (x, y)
+BETA = 0x7ae96a2b657c07106e64479eac3434e99cf0497512f58995c1396c28719501ee
+LAMBDA = 0x5363ad4cc05c30e0a5261c028812645a122e22ea20816678df02967c1b23bd72
+
+# short vectors (a1, b1), (a2, b2) with a + b * LAMBDA = 0 mod n, used to split the scalars in two halves
+GLV_A1 = 0x3086d221a7d46bcde86c90e49284eb15
+GLV_B1 = -0xe4437ed6010e88286f547fa90abfe4c3
+GLV_A2 = 0x114ca50f7a8e2f3f657c1108d9d44cfd8
+GLV_B2 = 0x3086d221a7d46bcde86c90e49284eb15
+
 NUM_BYTES_32 = 32
 
+# bits of the scalar consumed by every row of the precomputed table of G built in memory
+# (4 -> 64 rows of 15 points, a few ms to build: a short script never pays it back with a bigger window)
+G_TABLE_WINDOW = 4
+
+# window of the table of G saved to a file (8 -> 32 rows of 255 points): built once, mapped by every process
+G_TABLE_FILE_WINDOW = 8
+
+# number of signatures sent to a worker process at a time by verify_batch
+VERIFY_BATCH_CHUNK_SIZE = 64
+
+# nonces kept ready by a NoncePool, refilled in the background when fewer than NONCE_POOL_LOW_WATER are left
+NONCE_POOL_SIZE = 256
+NONCE_POOL_LOW_WATER = 64
+NONCE_POOL_BATCH = 32
+
+# maximum number of parsed public keys kept by parse_public_key
+PUBLIC_KEY_CACHE_SIZE = 4096
+
+# scalars multiplied together by the NumPy path of multiply_many (bigger batches don't fit in the CPU caches)
+VECTORIZED_CHUNK_SIZE = 4096
+
+# maximum number of private keys whose public key is kept by pubkey_from_privkey
+PRIVATE_KEY_CACHE_SIZE = 4096
+
+# width of the NAF representation used to multiply arbitrary points
+WNAF_WINDOW = 4
+
+# width of the NAF representation of the scalar of G in joint multiplications (64 precomputed points)
+G_WNAF_WINDOW = 8
+
+# odd multiples of G and of LAMBDA * G for joint multiplications, built the first time they're needed
+_G_ODD_MULTIPLES = None
+_G_ODD_MULTIPLES_LAMBDA = None
+
+# (window, precomputed multiples of G), built the first time it's needed (see generator_table_entry)
+_G_TABLE = None
+
+# file with the table of G saved by save_generator_table, loaded (memory-mapped) by generator_table if set
+G_TABLE_FILE_ENV_VAR = "CORSO_BITCOIN_G_TABLE"
+
+# header of a table file: magic, version, window, number of rows, points per row, sha256 of the points
+G_TABLE_FILE_MAGIC = b"CBGT"
+G_TABLE_FILE_VERSION = 1
+G_TABLE_FILE_HEADER = struct.Struct(">4sHHHH32s")
+
+# bytes of a point in a table file (x and y, 32 bytes each, big endian)
+G_TABLE_FILE_POINT_BYTES = 64
+
+# approximate memory taken by one affine point of a precomputed table (tuple of two 256-bit ints)
+AFFINE_POINT_BYTES = 184
+
+# fixed-base tables for frequently used points other than G (see configure_point_table_cache).
+# The cache is disabled as long as max_bytes is 0.
+POINT_TABLE_WINDOW = 4
+POINT_TABLE_MIN_USES = 2
+POINT_TABLE_TRACKED_POINTS = 1024
+_point_table_config = {'max_bytes': 0, 'window': POINT_TABLE_WINDOW, 'min_uses': POINT_TABLE_MIN_USES}
+_point_table_stats = {'hits': 0, 'misses': 0, 'builds': 0, 'evictions': 0, 'entries': 0, 'bytes': 0}
+# point -> (window, table), least recently used first
+_point_tables = OrderedDict()
+# point -> number of uses, for the points that don't have a table yet
+_point_uses = OrderedDict()
+
 
 def inverse(numero, primo=p):
     """Inverse operation in mod p"""
-    return pow(numero, -1, primo)
+    return invert(numero, primo)
 
 
 def double(P):
@@ -50,44 +139,979 @@ def add(P1, P2):
     return px_add, py_add
 
 
+def as_point(P):
+    """Wrap an affine tuple (x, y) into a Point (None stays None)"""
+    return None if P is None else Point(*P)
+
+
+def decompress_point(x: int, odd: bool):
+    """Return the point of the curve with abscissa x and the given parity of y, None if it doesn't exist"""
+    if x >= p:
+        return None
+    y_sq = (powmod(x, 3, p) + b) % p
+    y = powmod(y_sq, (p + 1) // 4, p)
+    if powmod(y, 2, p) != y_sq:
+        return None
+    return int(x), int(y if (y & 1) == odd else p - y)
+
+
+def parse_public_key_uncached(public_key: bytes):
+    """Decode a SEC public key (02/03 compressed, 04 uncompressed) or a 32-byte x-only key into a point of the curve.
+
+    Return None if the key is not valid."""
+    return as_point(decode_public_key(public_key))
+
+
+def decode_public_key(public_key: bytes):
+    """Decode a serialized public key into a tuple (x, y), None if it's not valid"""
+    prefix = public_key[:1]
+    if len(public_key) == 32:
+        # x-only key (BIP-340): the point with even y
+        return decompress_point(int_from_bytes(public_key), False)
+    if len(public_key) == 33 and prefix in (b'\x02', b'\x03'):
+        return decompress_point(int_from_bytes(public_key[1:]), prefix == b'\x03')
+    if len(public_key) == 65 and prefix == b'\x04':
+        x = int_from_bytes(public_key[1:33])
+        y = int_from_bytes(public_key[33:])
+        if x >= p or y >= p or (y * y - x ** 3 - a * x - b) % p != 0:
+            return None
+        return x, y
+    return None
+
+
+# cache in front of parse_public_key_uncached, replaced by configure_public_key_cache
+_parse_public_key_cached = lru_cache(maxsize=PUBLIC_KEY_CACHE_SIZE)(parse_public_key_uncached)
+
+
+def parse_public_key(public_key: bytes):
+    """Decode a serialized public key into a validated point of the curve (None if invalid), caching the result"""
+    return _parse_public_key_cached(bytes(public_key))
+
+
+def parse_sec_public_key(public_key: bytes):
+    """Like parse_public_key, but only for SEC keys (33 or 65 bytes): an x-only key is not a valid ECDSA key"""
+    if len(public_key) not in (33, 65):
+        return None
+    return parse_public_key(public_key)
+
+
+def configure_public_key_cache(maxsize=PUBLIC_KEY_CACHE_SIZE):
+    """Set the maximum number of public keys kept by parse_public_key (the cache is emptied)"""
+    global _parse_public_key_cached
+    _parse_public_key_cached = lru_cache(maxsize=maxsize)(parse_public_key_uncached)
+
+
+def public_key_cache_info():
+    """Return hits, misses, maxsize and currsize of the public key cache"""
+    return _parse_public_key_cached.cache_info()
+
+
+def public_key_cache_clear():
+    """Empty the public key cache and reset its statistics"""
+    _parse_public_key_cached.cache_clear()
+
+
+# -------------------------
+# Jacobian coordinates
+# -------------------------
+# A point (X, Y, Z) in Jacobian coordinates is the affine point (X / Z², Y / Z³).
+# Additions and doublings in this form don't need any modular inverse, so a whole
+# scalar multiplication can be done with a single inversion at the very end.
+
+# point at infinity (the neutral element of the group), Z = 0
+INFINITY = 0, 1, 0
+
+
+def to_jacobian(P):
+    """Convert an affine point (x, y) into Jacobian coordinates (X, Y, Z)"""
+    px, py = P
+    return mpz(px), mpz(py), mpz(1)
+
+
+def from_jacobian(P):
+    """Convert a point in Jacobian coordinates back to affine coordinates (None for the point at infinity)"""
+    X, Y, Z = P
+    if Z == 0:
+        return None
+    z_inv = inverse(Z)
+    z_inv_2 = (z_inv * z_inv) % p
+    return int((X * z_inv_2) % p), int((Y * z_inv_2 * z_inv) % p)
+
+
+def batch_inverse(values, modulus=p):
+    """Invert many non-zero values at once with Montgomery's trick: 3(n-1) multiplications and one inversion (plain ints)"""
+    # prefix[i] = values[0] * ... * values[i-1]
+    prefix = []
+    product = 1
+    for value in values:
+        prefix.append(product)
+        product = (product * value) % modulus
+    product_inv = inverse(product, modulus) if values else 1
+    result = [0] * len(values)
+    for i in reversed(range(len(values))):
+        # product_inv = 1 / (values[0] * ... * values[i])
+        result[i] = int((product_inv * prefix[i]) % modulus)
+        product_inv = (product_inv * values[i]) % modulus
+    return result
+
+
+def normalize_many(points):
+    """Convert many points from Jacobian to affine coordinates with a single inversion (None for the point at infinity)"""
+    z_invs = iter(batch_inverse([Z for _, _, Z in points if Z != 0]))
+    result = []
+    for X, Y, Z in points:
+        if Z == 0:
+            result.append(None)
+            continue
+        z_inv = next(z_invs)
+        z_inv_2 = (z_inv * z_inv) % p
+        result.append((int((X * z_inv_2) % p), int((Y * z_inv_2 * z_inv) % p)))
+    return result
+
+
+def jacobian_double(P):
+    """Add a point P to itself, in Jacobian coordinates (a = 0)"""
+    X1, Y1, Z1 = P
+    if Z1 == 0 or Y1 == 0:
+        return INFINITY
+    YY = (Y1 * Y1) % p
+    S = (4 * X1 * YY) % p
+    M = (3 * X1 * X1) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = (2 * Y1 * Z1) % p
+    return X3, Y3, Z3
+
+
+def jacobian_add(P1, P2):
+    """Add two points together, both in Jacobian coordinates"""
+    X1, Y1, Z1 = P1
+    X2, Y2, Z2 = P2
+    if Z1 == 0:
+        return P2
+    if Z2 == 0:
+        return P1
+    Z1Z1 = (Z1 * Z1) % p
+    Z2Z2 = (Z2 * Z2) % p
+    U1 = (X1 * Z2Z2) % p
+    U2 = (X2 * Z1Z1) % p
+    S1 = (Y1 * Z2 * Z2Z2) % p
+    S2 = (Y2 * Z1 * Z1Z1) % p
+    H = (U2 - U1) % p
+    R = (S2 - S1) % p
+    if H == 0:
+        # same x: either P1 == P2 (double) or P1 == -P2 (infinity)
+        if R == 0:
+            return jacobian_double(P1)
+        return INFINITY
+    HH = (H * H) % p
+    HHH = (H * HH) % p
+    V = (U1 * HH) % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - S1 * HHH) % p
+    Z3 = (Z1 * Z2 * H) % p
+    return X3, Y3, Z3
+
+
+def jacobian_add_affine(P1, P2):
+    """Add an affine point P2 to a point P1 in Jacobian coordinates ("mixed" addition, Z2 = 1)"""
+    X1, Y1, Z1 = P1
+    x2, y2 = P2
+    if Z1 == 0:
+        return to_jacobian(P2)
+    Z1Z1 = (Z1 * Z1) % p
+    U2 = (x2 * Z1Z1) % p
+    S2 = (y2 * Z1 * Z1Z1) % p
+    H = (U2 - X1) % p
+    R = (S2 - Y1) % p
+    if H == 0:
+        if R == 0:
+            return jacobian_double(P1)
+        return INFINITY
+    HH = (H * H) % p
+    HHH = (H * HH) % p
+    V = (X1 * HH) % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - Y1 * HHH) % p
+    Z3 = (Z1 * H) % p
+    return X3, Y3, Z3
+
+
+# -------------------------
+# Fixed-base multiplication
+# -------------------------
+# Row i of the table holds j * 2^(window * i) * G for j = 1 ... 2^window - 1, so
+# k * G is just the sum of one point per row, picked by the i-th window of k:
+# 256 / window mixed additions and no doublings at all.
+
+def build_fixed_base_table(point, window):
+    """Build the table of precomputed multiples of an affine point used for fixed-base multiplication"""
+    points = []
+    base = to_jacobian(point)
+    num_rows = -(-256 // window)
+    row_size = (1 << window) - 1
+    for _ in range(num_rows):
+        current = base
+        for _ in range(row_size):
+            points.append(current)
+            current = jacobian_add(current, base)
+        # after the loop current = 2^window * base, the base of the next row
+        base = current
+    # a single inversion for the whole table
+    points = normalize_many(points)
+    return [points[i * row_size:(i + 1) * row_size] for i in range(num_rows)]
+
+
+def build_generator_table(window=G_TABLE_WINDOW):
+    """Build the table of precomputed multiples of G used for fixed-base multiplication"""
+    return build_fixed_base_table(G, window)
+
+
+def generator_table_entry():
+    """Return (window, table of precomputed multiples of G), building it (or loading it from file) on first use.
+
+    The table is loaded from the file in CORSO_BITCOIN_G_TABLE (window G_TABLE_FILE_WINDOW) if set,
+    otherwise it's built in memory with window G_TABLE_WINDOW."""
+    global _G_TABLE
+    if _G_TABLE is None:
+        path = os.environ.get(G_TABLE_FILE_ENV_VAR)
+        if path and os.path.exists(path):
+            try:
+                _G_TABLE = G_TABLE_FILE_WINDOW, load_generator_table(path)
+            except (ValueError, OSError):
+                # stale, damaged or unreadable file (or a directory): the table is only a cache,
+                # build it again in memory
+                _G_TABLE = None
+        if _G_TABLE is None:
+            _G_TABLE = G_TABLE_WINDOW, build_generator_table()
+    return _G_TABLE
+
+
+def generator_table():
+    """Return the table of precomputed multiples of G (see generator_table_entry for its window)"""
+    return generator_table_entry()[1]
+
+
+# -------------------------
+# Table of G on disk
+# -------------------------
+# A table with the bigger window G_TABLE_FILE_WINDOW halves the additions of k * G, but
+# building it takes ~100 ms: worth it only after thousands of multiplications. It can
+# be saved once to a file (python ECDSA.py build-table FILE) and memory-mapped by every
+# process that sets CORSO_BITCOIN_G_TABLE=FILE: the pages of the file are shared between
+# processes and a point is decoded only the first time a multiplication reads it.
+
+class MappedTableRow:
+    """A row of a fixed-base table stored in a memory-mapped file, decoding its points on first access"""
+    __slots__ = ('buffer', 'offset', 'points')
+
+    def __init__(self, buffer, offset: int, size: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.points = [None] * size
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, index):
+        point = self.points[index]
+        if point is None:
+            start = self.offset + index * G_TABLE_FILE_POINT_BYTES
+            point = (int.from_bytes(self.buffer[start:start + NUM_BYTES_32], 'big'),
+                     int.from_bytes(self.buffer[start + NUM_BYTES_32:start + G_TABLE_FILE_POINT_BYTES], 'big'))
+            self.points[index] = point
+        return point
+
+
+def save_generator_table(path: str):
+    """Build the table of G (window G_TABLE_FILE_WINDOW) and write it to a file (with version and checksum) to be
+    loaded by load_generator_table"""
+    table = build_generator_table(G_TABLE_FILE_WINDOW)
+    body = b''.join(bytes_from_int(x, NUM_BYTES_32) + bytes_from_int(y, NUM_BYTES_32) for row in table for x, y in row)
+    header = G_TABLE_FILE_HEADER.pack(G_TABLE_FILE_MAGIC, G_TABLE_FILE_VERSION, G_TABLE_FILE_WINDOW,
+                                      len(table), len(table[0]), sha256(body).digest())
+    # write to a temporary file and rename, so a process never maps a half written table
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + body)
+    os.replace(tmp_path, path)
+
+
+def load_generator_table(path: str, verify=True):
+    """Memory-map a table of G saved by save_generator_table, raising ValueError if the file isn't valid"""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < G_TABLE_FILE_HEADER.size:
+        raise ValueError(f"{path}: not a table file")
+    magic, version, window, num_rows, row_size, checksum = G_TABLE_FILE_HEADER.unpack_from(buffer)
+    if magic != G_TABLE_FILE_MAGIC:
+        raise ValueError(f"{path}: not a table file")
+    if version != G_TABLE_FILE_VERSION:
+        raise ValueError(f"{path}: table file version {version}, expected {G_TABLE_FILE_VERSION}")
+    if window != G_TABLE_FILE_WINDOW or num_rows != -(-256 // window) or row_size != (1 << window) - 1:
+        raise ValueError(f"{path}: table with window {window}, expected {G_TABLE_FILE_WINDOW}")
+    body_size = num_rows * row_size * G_TABLE_FILE_POINT_BYTES
+    if len(buffer) != G_TABLE_FILE_HEADER.size + body_size:
+        raise ValueError(f"{path}: truncated table file")
+    view = memoryview(buffer)[G_TABLE_FILE_HEADER.size:]
+    if verify and sha256(view).digest() != checksum:
+        raise ValueError(f"{path}: wrong checksum")
+    row_bytes = row_size * G_TABLE_FILE_POINT_BYTES
+    return [MappedTableRow(view, i * row_bytes, row_size) for i in range(num_rows)]
+
+
+def use_generator_table_file(path: str):
+    """Load the table of G from a file now, instead of building it on first use"""
+    global _G_TABLE
+    _G_TABLE = G_TABLE_FILE_WINDOW, load_generator_table(path)
+
+
+def multiply_fixed_base_jacobian(k, table, window):
+    """Multiply a point by an integer value using its precomputed table, returning the result in Jacobian coordinates"""
+    k %= n
+    mask = (1 << window) - 1
+    result = INFINITY
+    for row in table:
+        digit = k & mask
+        if digit:
+            result = jacobian_add_affine(result, row[digit - 1])
+        k >>= window
+    return result
+
+
+def multiply_generator_jacobian(k):
+    """Multiply G by an integer value using the precomputed table, returning the result in Jacobian coordinates"""
+    window, table = generator_table_entry()
+    return multiply_fixed_base_jacobian(k, table, window)
+
+
+# -------------------------
+# Tables for other points
+# -------------------------
+# Points that are multiplied again and again (e.g. the public keys of a hot wallet)
+# can get their own fixed-base table. Tables are kept in a LRU cache bounded in memory
+# and a point gets one only after it has been used min_uses times.
+
+def fixed_base_table_bytes(window):
+    """Approximate memory taken by a fixed-base table with the given window"""
+    return -(-256 // window) * ((1 << window) - 1) * AFFINE_POINT_BYTES
+
+
+def configure_point_table_cache(max_bytes=0, window=POINT_TABLE_WINDOW, min_uses=POINT_TABLE_MIN_USES):
+    """Enable (max_bytes > 0) or disable (max_bytes = 0) the cache of fixed-base tables for points other than G"""
+    _point_table_config.update(max_bytes=max_bytes, window=window, min_uses=min_uses)
+    point_table_cache_clear()
+
+
+def point_table_cache_clear():
+    """Drop all the cached tables and reset the counters"""
+    _point_tables.clear()
+    _point_uses.clear()
+    for key in _point_table_stats:
+        _point_table_stats[key] = 0
+
+
+def point_table_cache_stats() -> dict:
+    """Return a snapshot of the counters of the cache of fixed-base tables"""
+    return dict(_point_table_stats, max_bytes=_point_table_config['max_bytes'])
+
+
+def cached_point_table(point):
+    """Return (window, table) for a point kept in the cache, building it once the point is used often enough.
+
+    Return None if the point doesn't have a table (or the cache is disabled)."""
+    max_bytes = _point_table_config['max_bytes']
+    if max_bytes <= 0:
+        return None
+    entry = _point_tables.get(point)
+    if entry is not None:
+        _point_tables.move_to_end(point)
+        _point_table_stats['hits'] += 1
+        return entry
+    _point_table_stats['misses'] += 1
+    window = _point_table_config['window']
+    size = fixed_base_table_bytes(window)
+    uses = _point_uses.pop(point, 0) + 1
+    if uses < _point_table_config['min_uses'] or size > max_bytes:
+        _point_uses[point] = uses
+        if len(_point_uses) > POINT_TABLE_TRACKED_POINTS:
+            _point_uses.popitem(last=False)
+        return None
+    entry = window, build_fixed_base_table(point, window)
+    _point_tables[point] = entry
+    _point_table_stats['builds'] += 1
+    _point_table_stats['bytes'] += size
+    # evict the least recently used tables until the cache fits in max_bytes
+    while _point_table_stats['bytes'] > max_bytes:
+        _point_tables.popitem(last=False)
+        _point_table_stats['evictions'] += 1
+        _point_table_stats['bytes'] -= size
+    _point_table_stats['entries'] = len(_point_tables)
+    return entry
+
+
+# -------------------------
+# Variable-base multiplication
+# -------------------------
+# In width-w NAF every non-zero digit is odd, lies in (-2^(w-1), 2^(w-1)) and is
+# followed by at least w-1 zeros, so on average only 1 bit out of w+1 costs an
+# addition. Negative digits are free, since -(x, y) = (x, p - y).
+
+def wnaf(k, w=WNAF_WINDOW):
+    """Return the width-w NAF digits of k, least significant digit first"""
+    digits = []
+    full = 1 << w
+    half = full >> 1
+    while k:
+        if k & 1:
+            digit = k & (full - 1)
+            if digit >= half:
+                digit -= full
+            k -= digit
+            digits.append(digit)
+            k >>= 1
+        else:
+            # skip the whole run of trailing zeros at once
+            zeros = (k & -k).bit_length() - 1
+            digits.extend([0] * zeros)
+            k >>= zeros
+    return digits
+
+
+def odd_multiples_jacobian(point, w=WNAF_WINDOW):
+    """Return the points P, 3P, 5P, ..., (2^(w-1) - 1)P in Jacobian coordinates"""
+    P = to_jacobian(point)
+    P2 = jacobian_double(P)
+    multiples = [P]
+    for _ in range((1 << (w - 2)) - 1):
+        multiples.append(jacobian_add(multiples[-1], P2))
+    return multiples
+
+
+def odd_multiples(point, w=WNAF_WINDOW):
+    """Return the affine points P, 3P, 5P, ..., (2^(w-1) - 1)P"""
+    x, y = point
+    return [(x, y)] + normalize_many(odd_multiples_jacobian(point, w)[1:])
+
+
+def multiply_interleaved_jacobian(terms):
+    """Compute k1 * P1 + k2 * P2 + ... sharing a single chain of doublings, result in Jacobian coordinates.
+
+    Every term is a pair (k, odd multiples of P), with k in (-n, n), and the width of the NAF of k follows from
+    the size of the table."""
+    # for every bit position, the list of points to add after the doubling
+    additions = []
+    for k, table in terms:
+        if k == 0:
+            continue
+        # k * P = |k| * (-P): flip the sign of all the digits
+        sign = 1 if k > 0 else -1
+        digits = wnaf(abs(k), len(table).bit_length() + 1)
+        if len(digits) > len(additions):
+            additions.extend([] for _ in range(len(digits) - len(additions)))
+        for i, digit in enumerate(digits):
+            digit *= sign
+            if digit > 0:
+                additions[i].append(table[digit >> 1])
+            elif digit < 0:
+                x, y = table[-digit >> 1]
+                additions[i].append((x, p - y))
+    result = INFINITY
+    for points in reversed(additions):
+        result = jacobian_double(result)
+        for point in points:
+            result = jacobian_add_affine(result, point)
+    return result
+
+
+# -------------------------
+# GLV endomorphism
+# -------------------------
+# k * P = k1 * P + k2 * (LAMBDA * P) with k1, k2 of about 128 bits, and LAMBDA * P
+# costs one multiplication (BETA * x). Interleaving the two halves halves the doublings.
+
+def glv_split(k):
+    """Split k (mod n) into k1, k2 of about 128 bits (possibly negative) such that k = k1 + k2 * LAMBDA mod n"""
+    k %= n
+    # c1 = round(b2 * k / n), c2 = round(-b1 * k / n)
+    c1 = (GLV_B2 * k + n // 2) // n
+    c2 = (-GLV_B1 * k + n // 2) // n
+    k1 = k - c1 * GLV_A1 - c2 * GLV_A2
+    k2 = -c1 * GLV_B1 - c2 * GLV_B2
+    return k1, k2
+
+
+def endomorphism(table):
+    """Apply LAMBDA to a list of affine points: (x, y) -> (BETA * x, y)"""
+    return [((BETA * x) % p, y) for x, y in table]
+
+
+def glv_terms(k, table, table_lambda=None):
+    """Return the terms of k * P for multiply_interleaved_jacobian, given the odd multiples of P"""
+    k1, k2 = glv_split(k)
+    if table_lambda is None:
+        table_lambda = endomorphism(table)
+    return [(k1, table), (k2, table_lambda)]
+
+
+def multiply_wnaf_jacobian(k, point, w=WNAF_WINDOW):
+    """Multiply an arbitrary affine point by an integer value using GLV and width-w NAF, result in Jacobian coordinates"""
+    return multiply_interleaved_jacobian(glv_terms(k, odd_multiples(point, w)))
+
+
+def generator_odd_multiples():
+    """Return the odd multiples of G and of LAMBDA * G used for joint multiplications, building them on first use"""
+    global _G_ODD_MULTIPLES, _G_ODD_MULTIPLES_LAMBDA
+    if _G_ODD_MULTIPLES is None:
+        _G_ODD_MULTIPLES = odd_multiples(G, G_WNAF_WINDOW)
+        _G_ODD_MULTIPLES_LAMBDA = endomorphism(_G_ODD_MULTIPLES)
+    return _G_ODD_MULTIPLES, _G_ODD_MULTIPLES_LAMBDA
+
+
+def multiply_joint_jacobian(u1, u2, point):
+    """Compute u1 * G + u2 * point (Strauss-Shamir with GLV), result in Jacobian coordinates"""
+    entry = cached_point_table(point)
+    if entry is not None:
+        # both points have a fixed-base table: no doublings at all
+        return jacobian_add(multiply_generator_jacobian(u1), multiply_fixed_base_jacobian(u2, entry[1], entry[0]))
+    return multiply_interleaved_jacobian(glv_terms(u1, *generator_odd_multiples())
+                                         + glv_terms(u2, odd_multiples(point)))
+
+
+def multiply_joint(u1, u2, point):
+    """Compute u1 * G + u2 * point with one shared chain of doublings"""
+    return as_point(from_jacobian(multiply_joint_jacobian(u1, u2, point)))
+
+
+# -------------------------
+# Multi-scalar multiplication
+# -------------------------
+# Pippenger's bucket method: for every window of c bits, each point is added once
+# into the bucket of its digit, then the buckets are summed with a running sum, so
+# sum(B_j * j) costs 2 * 2^c additions instead of one multiplication per point.
+# Every scalar is first split with GLV into two halves of ~128 bits (on P and on
+# LAMBDA * P): twice the points, but half the windows, so half the doublings and
+# half the bucket sums.
+
+def pippenger_window(num_points, bits=256):
+    """Choose the window size c that minimises the number of additions for num_points scalars of bits bits"""
+    return min(range(1, 17), key=lambda c: -(-bits // c) * (num_points + 2 ** (c + 1)))
+
+
+def multi_multiply_jacobian(scalars, points):
+    """Compute k1 * P1 + k2 * P2 + ... for many affine points (Pippenger), result in Jacobian coordinates"""
+    pairs = []
+    for k, P in zip(scalars, points):
+        k1, k2 = glv_split(k)
+        x, y = P[0], P[1]
+        for half, half_x in ((k1, x), (k2, (BETA * x) % p)):
+            # a negative half multiplies the opposite point
+            if half > 0:
+                pairs.append((half, (half_x, y)))
+            elif half < 0:
+                pairs.append((-half, (half_x, p - y)))
+    if not pairs:
+        return INFINITY
+    bits = max(k.bit_length() for k, _ in pairs)
+    c = pippenger_window(len(pairs), bits)
+    mask = (1 << c) - 1
+    result = INFINITY
+    for window in reversed(range(-(-bits // c))):
+        for _ in range(c):
+            result = jacobian_double(result)
+        shift = window * c
+        buckets = [INFINITY] * mask
+        for k, P in pairs:
+            digit = (k >> shift) & mask
+            if digit:
+                buckets[digit - 1] = jacobian_add_affine(buckets[digit - 1], P)
+        # sum(j * B_j) = B_max + (B_max + B_max-1) + ... with two running sums
+        running = INFINITY
+        window_sum = INFINITY
+        for bucket in reversed(buckets):
+            running = jacobian_add(running, bucket)
+            window_sum = jacobian_add(window_sum, running)
+        result = jacobian_add(result, window_sum)
+    return result
+
+
+def multi_multiply(scalars, points):
+    """Compute k1 * P1 + k2 * P2 + ... for many points at once"""
+    return as_point(from_jacobian(multi_multiply_jacobian(scalars, points)))
+
+
+def multiply_jacobian(k, point=G):
+    """Multiply an affine point by an integer value, returning the result in Jacobian coordinates"""
+    if point is G:
+        return multiply_generator_jacobian(k)
+    entry = cached_point_table(point)
+    if entry is not None:
+        return multiply_fixed_base_jacobian(k, entry[1], entry[0])
+    return multiply_wnaf_jacobian(k, point)
+
+
 def multiply(k, point=G):
     """Use double and add operations to quickly multiply a point by an integer value"""
-    # create a copy of initial point
-    current = point
-    # convert integer into binary representation
-    binary_k = str(bin(k)[2:])  # [:2] to cut '0b' that python adds in the beginning
-    # double & add algorithm for fast multiplication
-    for i in range(1, len(binary_k)):  # start from binary_k[1] in order to avoid first element
-        # 0 -> double
-        current = double(current)
-        # 1 -> & add
-        if binary_k[i] == "1":
-            current = add(current, point)
-    return current
-
-
-def sign(private_key: int, msg: bytes, k=None):
-    """Sign a message with a priv key"""
-    # generate k if not given
-    if k is None:
-        k = secrets.randbelow(n)
-    # generate point R = kG
-    Rx, Ry = multiply(k)
+    # all the work is done in Jacobian coordinates, with only one inversion at the end
+    return as_point(from_jacobian(multiply_jacobian(k, point)))
+
+
+def multiply_many(scalars, point=G, vectorized=False):
+    """Multiply a point by many integer values, with a single inversion for all the results.
+
+    With vectorized=True the additions are done with NumPy on the whole batch (G and points with a cached table
+    only, the others use the scalar path): same results, bit for bit. It only pays off with the plain Python
+    backend: with gmpy2 the scalar path is faster."""
+    if vectorized:
+        if not NumpyField.available():
+            raise ImportError("multiply_many(vectorized=True) needs numpy")
+        entry = generator_table_entry() if point is G else cached_point_table(point)
+        if entry is not None:
+            window, table = entry
+            scalars = [k % n for k in scalars]
+            points = []
+            for i in range(0, len(scalars), VECTORIZED_CHUNK_SIZE):
+                chunk = scalars[i:i + VECTORIZED_CHUNK_SIZE]
+                points.extend(NumpyField.multiply_fixed_base_many(chunk, table, window))
+            return [as_point(P) for P in normalize_many(points)]
+    return [as_point(P) for P in normalize_many([multiply_jacobian(k, point) for k in scalars])]
+
+
+def pubkey_from_privkey_uncached(private_key: int):
+    """Compute the public key (private_key * G) of a private key"""
+    return multiply(private_key)
+
+
+_pubkey_from_privkey_cached = lru_cache(maxsize=PRIVATE_KEY_CACHE_SIZE)(pubkey_from_privkey_uncached)
+
+
+def pubkey_from_privkey(private_key: int):
+    """Return the public key of a private key, caching the result so each key is multiplied only once"""
+    return _pubkey_from_privkey_cached(int(private_key) % n)
+
+
+def configure_pubkey_cache(maxsize=PRIVATE_KEY_CACHE_SIZE):
+    """Set the maximum number of private keys kept by pubkey_from_privkey (the cache is emptied)"""
+    global _pubkey_from_privkey_cached
+    _pubkey_from_privkey_cached = lru_cache(maxsize=maxsize)(pubkey_from_privkey_uncached)
+
+
+def pubkey_cache_clear():
+    """Empty the private key cache and reset its statistics"""
+    _pubkey_from_privkey_cached.cache_clear()
+
+
+def pubkey_cache_stats() -> dict:
+    """Return hits, misses, maxsize, currsize and hit rate of the private key cache"""
+    info = _pubkey_from_privkey_cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'maxsize': info.maxsize,
+        'currsize': info.currsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+class SigningKey:
+    """A private key together with the data derived from it, computed once and reused for every signature"""
+    __slots__ = ('private_key', 'public_key')
+
+    def __init__(self, private_key: int):
+        self.private_key = private_key
+        self.public_key = pubkey_from_privkey(private_key)
+
+    def sign(self, msg: bytes, k=None, nonce_pool=None, grind=False):
+        """Sign a message with this key"""
+        return sign(self, msg, k, nonce_pool, grind)
+
+    def sign_many(self, msgs: [bytes]) -> [(bytes, bytes)]:
+        """Sign many messages with this key, sharing the inversions of all the nonces"""
+        ks = [secrets.randbelow(n - 1) + 1 for _ in msgs]
+        Rs = multiply_many(ks)
+        k_invs = batch_inverse(ks, n)
+        return [sign_with_nonce(self.private_key, msg, R, k_inv) for msg, R, k_inv in zip(msgs, Rs, k_invs)]
+
+
+# taken by a forked process that replaces the nonces of a pool with its own
+_nonce_pool_fork_lock = threading.Lock()
+
+
+class NoncePool:
+    """Nonces (k, R = kG, k^-1 mod n) precomputed by a background thread, each of them handed out only once.
+
+    Signing with a nonce from the pool costs only a few multiplications mod n and the hashing.
+    A process forked from the owner of the pool throws away the inherited nonces (the parent
+    can still hand them out) and starts filling the pool again with its own."""
+
+    def __init__(self, size=NONCE_POOL_SIZE, low_water=NONCE_POOL_LOW_WATER, batch=NONCE_POOL_BATCH):
+        self.size = size
+        self.low_water = low_water
+        self.batch = batch
+        self.closed = False
+        self.start()
+
+    def start(self):
+        """Start with an empty pool, owned by this process, and its background thread"""
+        self.pid = os.getpid()
+        self.nonces = deque()
+        self.wanted = threading.Event()
+        self.wanted.set()
+        self.thread = threading.Thread(target=self.run, name="NoncePool", daemon=True)
+        self.thread.start()
+
+    def check_fork(self):
+        """Drop the nonces inherited from the parent if this is a forked process"""
+        if self.pid != os.getpid():
+            with _nonce_pool_fork_lock:
+                if self.pid != os.getpid():
+                    if self.closed:
+                        self.pid = os.getpid()
+                        self.nonces = deque()
+                    else:
+                        self.start()
+
+    def generate(self, count):
+        """Compute count fresh nonces, normalizing the points and inverting the k's all together"""
+        ks = [secrets.randbelow(n - 1) + 1 for _ in range(count)]
+        return list(zip(ks, multiply_many(ks), batch_inverse(ks, n)))
+
+    def run(self):
+        """Background loop: wait until the pool goes below the low-water mark, then fill it up again"""
+        while True:
+            self.wanted.wait()
+            if self.closed:
+                return
+            self.wanted.clear()
+            while not self.closed and len(self.nonces) < self.size:
+                self.nonces.extend(self.generate(min(self.batch, self.size - len(self.nonces))))
+
+    def pop(self):
+        """Take a nonce (k, R, k^-1) out of the pool, it will never be returned again"""
+        self.check_fork()
+        try:
+            # deque.popleft is atomic: two threads can't get the same nonce
+            nonce = self.nonces.popleft()
+        except IndexError:
+            # the pool is empty: compute one on the spot
+            nonce = self.generate(1)[0]
+        if len(self.nonces) < self.low_water:
+            self.wanted.set()
+        return nonce
+
+    def __len__(self):
+        self.check_fork()
+        return len(self.nonces)
+
+    def close(self):
+        """Stop the background thread and throw away the unused nonces"""
+        self.closed = True
+        self.wanted.set()
+        if self.pid == os.getpid():
+            # a forked process didn't inherit the thread
+            self.thread.join()
+        self.nonces.clear()
+
+
+def sign_with_nonce_recoverable(private_key: int, msg: bytes, R: (int, int), k_inv: int) -> (int, int, int):
+    """Sign a message with a priv key, given R = kG and the inverse of k mod n: return r, s and the recovery id"""
+    Rx, Ry = R
     # generate the signature (r,s)
     r = Rx % n  # r is the coordinate_x mod n
-    s = (inverse(k, n) * (int_from_bytes(msg) + private_key * r)) % n
-    # choose the "low-s" value of s
+    s = (k_inv * (int_from_bytes(msg) + private_key * r)) % n
+    # recovery id: bit 0 is the parity of y of R, bit 1 tells if the x of R was >= n
+    recid = (Ry & 1) | (2 if Rx >= n else 0)
+    # choose the "low-s" value of s (that's the signature of -R, so the parity flips)
     if s > n // 2:
         s = n - s
+        recid ^= 1
+    return r, s, recid
+
+
+def sign_with_nonce(private_key: int, msg: bytes, R: (int, int), k_inv: int):
+    """Sign a message with a priv key, given the nonce point R = kG and the inverse of k mod n"""
+    r, s, _ = sign_with_nonce_recoverable(private_key, msg, R, k_inv)
     return bytes_from_int(r, NUM_BYTES_32), bytes_from_int(s, NUM_BYTES_32)
 
 
+def sign_grind(private_key: int, msg: bytes, k=None, nonce_pool=None) -> ((bytes, bytes), int):
+    """Sign a message with a "low-R" signature (r < 2^255, one byte shorter once DER-encoded).
+
+    Nonces k, k+1, k+2, ... are tried moving from R to R + G, one point addition each.
+    Return the signature and the number of nonces tried."""
+    if isinstance(private_key, SigningKey):
+        private_key = private_key.private_key
+    k_inv = None
+    if k is None and nonce_pool is not None:
+        k, R, k_inv = nonce_pool.pop()
+    else:
+        if k is None:
+            k = secrets.randbelow(n)
+        R = multiply(k)
+    iterations = 1
+    while R is None or R[0] % n >= 2 ** 255:
+        k = (k + 1) % n
+        R = from_jacobian(jacobian_add_affine(INFINITY if R is None else to_jacobian(R), G))
+        iterations += 1
+    if iterations > 1 or k_inv is None:
+        k_inv = inverse(k, n)
+    return sign_with_nonce(private_key, msg, R, k_inv), iterations
+
+
+def sign(private_key: int, msg: bytes, k=None, nonce_pool=None, grind=False):
+    """Sign a message with a priv key (an int or a SigningKey), taking the nonce from nonce_pool if given.
+
+    With grind=True the signature is "low-R" (see sign_grind)."""
+    if grind:
+        return sign_grind(private_key, msg, k, nonce_pool)[0]
+    if isinstance(private_key, SigningKey):
+        private_key = private_key.private_key
+    if k is None and nonce_pool is not None:
+        _, R, k_inv = nonce_pool.pop()
+        return sign_with_nonce(private_key, msg, R, k_inv)
+    # generate k if not given
+    if k is None:
+        k = secrets.randbelow(n)
+    # generate point R = kG
+    R = multiply(k)
+    return sign_with_nonce(private_key, msg, R, inverse(k, n))
+
+
 def verify(public_key: bytes, msg: bytes, sig: (bytes, bytes)) -> bool:
-    """Verify a signature in relation of a message and a public key"""
+    """Verify a signature in relation of a message and a public key (SEC serialized or as a point of the curve)"""
+    if isinstance(public_key, (bytes, bytearray, memoryview)):
+        public_key = parse_sec_public_key(public_key)
+        if public_key is None:
+            return False
     r, s = sig
-    # generate the two parts of the final equation
-    first_addend = multiply(inverse(int_from_bytes(s), n) * int_from_bytes(msg))
-    second_addend = multiply(inverse(int_from_bytes(s), n) * int_from_bytes(r), int_from_bytes(public_key))
-    # add the two points generated before in order to get R
-    Rx, _ = add(first_addend, second_addend)
-    return Rx == r
+    r, s = int_from_bytes(r), int_from_bytes(s)
+    if not (0 < r < n and 0 < s < n):
+        return False
+    s_inv = inverse(s, n)
+    # R = u1 * G + u2 * Q, computed in one go sharing the doublings
+    u1 = (s_inv * int_from_bytes(msg)) % n
+    u2 = (s_inv * r) % n
+    R = multiply_joint(u1, u2, public_key)
+    if R is None:
+        return False
+    return R[0] % n == r
+
+
+def verify_chunk(items) -> [bool]:
+    """Verify a list of (public_key, msg, sig) triples one after the other"""
+    return [verify(public_key, msg, sig) for public_key, msg, sig in items]
+
+
+def verify_batch(items, workers=None, chunk_size=VERIFY_BATCH_CHUNK_SIZE) -> [bool]:
+    """Verify many (public_key, msg, sig) triples, sharding the work across a pool of processes.
+
+    Results are in the same order of the items. With workers=1 (or a single chunk) everything runs in this process."""
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return verify_chunk(items)
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for chunk_results in pool.map(verify_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+# -------------------------
+# Public key recovery
+# -------------------------
+# A recoverable signature is 65 bytes: recovery id (0...3) + r + s. From r and the
+# recovery id we get back R, and the public key is Q = r^-1 * (s * R - e * G).
+
+def sign_recoverable(private_key: int, msg: bytes, k=None, nonce_pool=None) -> bytes:
+    """Sign a message with a priv key (an int or a SigningKey), returning a 65-byte recoverable signature"""
+    if isinstance(private_key, SigningKey):
+        private_key = private_key.private_key
+    if k is None and nonce_pool is not None:
+        _, R, k_inv = nonce_pool.pop()
+    else:
+        if k is None:
+            k = secrets.randbelow(n)
+        R = multiply(k)
+        k_inv = inverse(k, n)
+    r, s, recid = sign_with_nonce_recoverable(private_key, msg, R, k_inv)
+    return bytes([recid]) + bytes_from_int(r, NUM_BYTES_32) + bytes_from_int(s, NUM_BYTES_32)
+
+
+def parse_recoverable_signature(sig: bytes):
+    """Decode a 65-byte recoverable signature into (R, r, s), None if it's not valid"""
+    if len(sig) != 65 or sig[0] > 3:
+        return None
+    recid = sig[0]
+    r = int_from_bytes(sig[1:33])
+    s = int_from_bytes(sig[33:])
+    if not (0 < r < n and 0 < s < n):
+        return None
+    R = decompress_point(r + n if recid & 2 else r, bool(recid & 1))
+    if R is None:
+        return None
+    return R, r, s
+
+
+def recover_public_key(msg: bytes, sig: bytes):
+    """Return the public key (as a point) that produced a recoverable signature of msg, None if it's not valid"""
+    parsed = parse_recoverable_signature(sig)
+    if parsed is None:
+        return None
+    R, r, s = parsed
+    r_inv = inverse(r, n)
+    return multiply_joint((-int_from_bytes(msg) * r_inv) % n, (s * r_inv) % n, R)
+
+
+def recover_public_keys(items) -> list:
+    """Recover the public keys of many (msg, recoverable sig) pairs (None for the invalid ones).
+
+    The inverses of all the r's, the tables of odd multiples of all the R's and all the results are computed
+    with one inversion each."""
+    items = list(items)
+    parsed = [parse_recoverable_signature(sig) for _, sig in items]
+    valid = [i for i, entry in enumerate(parsed) if entry is not None]
+    r_invs = batch_inverse([parsed[i][1] for i in valid], n)
+    # odd multiples of every R, normalized all together
+    table_size = 1 << (WNAF_WINDOW - 2)
+    multiples = normalize_many([Q for i in valid for Q in odd_multiples_jacobian(parsed[i][0])])
+    G_tables = generator_odd_multiples()
+    points = []
+    for j, (i, r_inv) in enumerate(zip(valid, r_invs)):
+        R, r, s = parsed[i]
+        u1 = (-int_from_bytes(items[i][0]) * r_inv) % n
+        u2 = (s * r_inv) % n
+        table = multiples[j * table_size:(j + 1) * table_size]
+        points.append(multiply_interleaved_jacobian(glv_terms(u1, *G_tables) + glv_terms(u2, table)))
+    results = [None] * len(items)
+    for i, Q in zip(valid, normalize_many(points)):
+        results[i] = as_point(Q)
+    return results
+
+
+# functions counted by Instrumentation when it's enabled, with their category
+Instrumentation.register(__name__, {
+    'inverse': 'inversions',
+    'double': 'point_doublings',
+    'jacobian_double': 'point_doublings',
+    'add': 'point_additions',
+    'jacobian_add': 'point_additions',
+    'jacobian_add_affine': 'point_additions',
+    'multiply_fixed_base_jacobian': 'fixed_base_multiplications',
+    'multiply_wnaf_jacobian': 'variable_base_multiplications',
+    'multiply_joint_jacobian': 'joint_multiplications',
+    'multi_multiply_jacobian': 'multi_scalar_multiplications',
+    'sign_with_nonce_recoverable': 'ecdsa_signs',
+    'verify': 'ecdsa_verifies',
+})
+
+
+if __name__ == '__main__':
+    # python ECDSA.py build-table FILE: save the table of G, to be used with CORSO_BITCOIN_G_TABLE=FILE
+    if len(sys.argv) != 3 or sys.argv[1] != "build-table":
+        sys.exit(f"usage: python {sys.argv[0]} build-table FILE")
+    save_generator_table(sys.argv[2])
+    print(f"table of G (window {G_TABLE_FILE_WINDOW}) saved to {sys.argv[2]}")
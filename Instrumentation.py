@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+from functools import wraps
+from time import perf_counter
+
+# -------------------------------------------------------------------------- #
+#
+# Opt-in counters for the hot paths of ECDSA.py and Schnorr.py
+#
+# Every module registers the functions to count, each one under a category
+# (e.g. "point_additions"). enable() replaces them with wrappers that count
+# the calls and the time spent inside (inclusive of the nested calls), in the
+# module that defines them and in the modules known to import them by name
+# (IMPORTING_MODULES, plus any module passed to track()). disable() puts the
+# original functions back, so when the counters are off there is no wrapper
+# left and they cost nothing at all. Modules outside these lists are never
+# touched: code of your own that imported a function by name keeps calling
+# the original one unless it's tracked.
+#
+# The environment variable CORSO_BITCOIN_STATS=1 enables them at import.
+#
+# -------------------------------------------------------------------------- #
+
+STATS_ENV_VAR = "CORSO_BITCOIN_STATS"
+
+# modules of the course that import registered functions by name
+IMPORTING_MODULES = (
+    'Keys',
+    'derivazione',
+    'tx_legacy_P2PKH',
+    'tx_legacy_P2SH',
+    'tx_mixed_P2SH_P2WPKH',
+    'tx_mixed_P2SH_P2WSH',
+    'tx_segwit_P2WPKH',
+    'tx_segwit_P2WSH',
+    'tx_taproot_key_path',
+    'tx_taproot_tapscript_path',
+)
+
+# (module name, function name) -> category, for every registered function
+_registered = {}
+
+# names of the modules whose globals are rebound: the registered ones, IMPORTING_MODULES and the tracked ones
+_modules = set(IMPORTING_MODULES)
+
+# category -> [calls, seconds]
+_stats = {}
+
+# original function -> wrapper, while the counters are enabled
+_wrappers = {}
+_enabled = False
+
+_lock = threading.Lock()
+
+
+def counted(function, category: str):
+    """Wrap a function so that every call adds 1 and its duration to the counters of the category"""
+    entry = _stats.setdefault(category, [0, 0.0])
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            with _lock:
+                entry[0] += 1
+                entry[1] += elapsed
+    return wrapper
+
+
+def replace_in_modules(replacements: dict, module_names=None):
+    """Rebind the globals of the known modules (or of module_names) that are keys of replacements to their values"""
+    # match by identity: the other globals are never hashed or compared
+    by_id = {id(function): replacement for function, replacement in replacements.items()}
+    for module_name in list(_modules if module_names is None else module_names):
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        namespace = module.__dict__
+        for name, value in list(namespace.items()):
+            replacement = by_id.get(id(value))
+            if replacement is not None:
+                namespace[name] = replacement
+
+
+def track(module_name: str):
+    """Also rebind the registered functions imported by name in this module (e.g. "__main__" of a script)"""
+    with _lock:
+        _modules.add(module_name)
+    if _enabled:
+        replace_in_modules(_wrappers, [module_name])
+
+
+def register(module_name: str, functions: dict):
+    """Register the functions {name: category} of a module, wrapping them right away if the counters are on"""
+    module = sys.modules[module_name]
+    _modules.add(module_name)
+    for name, category in functions.items():
+        _registered[module_name, name] = category
+        _stats.setdefault(category, [0, 0.0])
+        if _enabled:
+            function = getattr(module, name)
+            wrapper = counted(function, category)
+            _wrappers[function] = wrapper
+            replace_in_modules({function: wrapper})
+
+
+def enabled() -> bool:
+    """True if the counters are on"""
+    return _enabled
+
+
+def enable():
+    """Turn the counters on (registered functions are replaced by counting wrappers)"""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    for (module_name, name), category in _registered.items():
+        function = getattr(sys.modules[module_name], name)
+        _wrappers[function] = counted(function, category)
+    replace_in_modules(_wrappers)
+
+
+def disable():
+    """Turn the counters off, putting the original functions back"""
+    global _enabled
+    if not _enabled:
+        return
+    _enabled = False
+    replace_in_modules({wrapper: function for function, wrapper in _wrappers.items()})
+    _wrappers.clear()
+
+
+def stats() -> dict:
+    """Return a snapshot {category: {"calls": ..., "seconds": ...}} of the counters"""
+    with _lock:
+        return {category: {'calls': calls, 'seconds': seconds} for category, (calls, seconds) in _stats.items()}
+
+
+def reset():
+    """Set all the counters back to zero"""
+    with _lock:
+        for entry in _stats.values():
+            entry[0] = 0
+            entry[1] = 0.0
+
+
+if os.environ.get(STATS_ENV_VAR, "") not in ("", "0"):
+    enable()
@@ -1,18 +1,20 @@
 from Tools import bytes_from_int
+from ECDSA import normalize_many
+from Point import Point, ser_compressed, ser_uncompressed
 
 # Definisco alcune costanti
 NUM_BYTE_32 = 32
 
 def ser_public_key_ECDSA(public_key: (int, int), compressed=True) -> bytes:
     """Serialize the public key from its coordinates"""
+    # a Point keeps its serializations: they're computed only the first time
+    if isinstance(public_key, Point):
+        return public_key.compressed if compressed else public_key.uncompressed
     px, py = public_key
     if compressed:
-        if py % 2 == 0:
-            return b'\x02' + bytes_from_int(px, NUM_BYTE_32)
-        else:
-            return b'\x03' + bytes_from_int(px, NUM_BYTE_32)
+        return ser_compressed(px, py)
     else:
-        return b'\x04' + bytes_from_int(px, NUM_BYTE_32) + bytes_from_int(py, NUM_BYTE_32)
+        return ser_uncompressed(px, py)
 
 
 def ser_public_key_compressed(public_key: (int, int)) -> bytes:
@@ -27,4 +29,11 @@ def ser_public_key_uncompressed(public_key: (int, int)) -> bytes:
 
 def ser_public_key_schnorr(public_key: (int, int)) -> bytes:
     """Serialize the public key in schnorr format from its coordinates"""
+    if isinstance(public_key, Point):
+        return public_key.x_only
     return bytes_from_int(public_key[0], NUM_BYTE_32)
+
+
+def ser_public_keys_ECDSA(public_keys: [(int, int, int)], compressed=True) -> [bytes]:
+    """Serialize many public keys given in Jacobian coordinates, converting them to affine with a single inversion"""
+    return [ser_public_key_ECDSA(public_key, compressed) for public_key in normalize_many(public_keys)]
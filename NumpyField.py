@@ -0,0 +1,231 @@
+from collections import OrderedDict
+
+# -------------------------------------------------------------------------- #
+#
+# Vectorized field arithmetic of secp256k1 with NumPy (optional dependency)
+#
+# A batch of N field elements is an array of shape (8, N): 8 limbs of 32 bits,
+# least significant first, each stored in a uint64 so that the product of two
+# limbs fits. Every operation works on the whole batch at once.
+#
+# Values are kept "weakly reduced": smaller than 2^256 but not always smaller
+# than p. They are congruent to the exact results, so once converted back to
+# Python ints and reduced mod p they are identical to the scalar path.
+#
+# NumPy is imported by available(), on the first vectorized call: importing
+# this module costs nothing to whoever never opts in.
+#
+# -------------------------------------------------------------------------- #
+
+# the numpy module once available() has imported it
+np = None
+_numpy_missing = False
+
+# 2^256 mod p: p = 2^256 - 2^32 - 977, so the part above 2^256 folds back as H * (2^32 + 977)
+REDUCTION_C = 2 ** 32 + 977
+FIELD_P = 2 ** 256 - REDUCTION_C
+
+NUM_LIMBS = 8
+LIMB_BITS = 32
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+# maximum number of fixed-base tables kept in limb form
+LIMB_TABLE_CACHE_SIZE = 4
+
+# tables of points converted to limbs, keyed by id of the original table (which is kept alive here)
+_limb_tables = OrderedDict()
+
+
+def available() -> bool:
+    """True if NumPy can be imported (importing it on the first call): call it before any other function"""
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np is not None
+
+
+def borrowed_two_p():
+    """Split 2p in 9 limbs, each of the first 8 borrowing 2^32 from the next one (so a + 2p - b never goes negative)"""
+    value = 2 * FIELD_P
+    limbs = [(value >> (LIMB_BITS * i)) & LIMB_MASK for i in range(NUM_LIMBS + 1)]
+    for i in range(NUM_LIMBS):
+        limbs[i] += 1 << LIMB_BITS
+        limbs[i + 1] -= 1
+    return limbs
+
+
+# 2p with borrowed limbs, added before every subtraction
+TWO_P_LIMBS = borrowed_two_p()
+
+
+def to_limbs(values):
+    """Convert a list of Python ints smaller than 2^256 to an array of limbs of shape (8, N)"""
+    data = b''.join(value.to_bytes(32, 'little') for value in values)
+    return np.frombuffer(data, dtype='<u4').reshape(len(values), NUM_LIMBS).T.astype(np.uint64)
+
+
+def from_limbs(limbs):
+    """Convert an array of limbs of shape (8, N) back to a list of Python ints (reduced mod p)"""
+    data = limbs.T.astype('<u4').tobytes()
+    return [int.from_bytes(data[i:i + 32], 'little') % FIELD_P for i in range(0, len(data), 32)]
+
+
+def carry(limbs):
+    """Propagate the carries of a list of limb arrays, so that every limb but the last one is < 2^32"""
+    for i in range(len(limbs) - 1):
+        limbs[i + 1] += limbs[i] >> LIMB_BITS
+        limbs[i] &= LIMB_MASK
+    return limbs
+
+
+def reduce(limbs):
+    """Bring a list of 9 limb arrays (value < 2^320) back to 8 limbs of a weakly reduced value"""
+    # two folds of the limb above 2^256 bring any value below 2^256
+    for _ in range(2):
+        top = limbs[NUM_LIMBS]
+        limbs[NUM_LIMBS] = np.zeros_like(top)
+        limbs[0] += top * 977
+        limbs[1] += top
+        carry(limbs)
+    return np.stack(limbs[:NUM_LIMBS])
+
+
+def add(a, b):
+    """a + b mod p for two batches of field elements"""
+    return reduce(carry(list(a + b) + [np.zeros_like(a[0])]))
+
+
+def sub(a, b):
+    """a - b mod p for two batches of field elements"""
+    limbs = [a[i] + TWO_P_LIMBS[i] - b[i] for i in range(NUM_LIMBS)]
+    limbs.append(np.full_like(a[0], TWO_P_LIMBS[NUM_LIMBS]))
+    return reduce(carry(limbs))
+
+
+def mul_small(a, c: int):
+    """c * a mod p for a batch of field elements and a small constant c"""
+    return reduce(carry(list(a * np.uint64(c)) + [np.zeros_like(a[0])]))
+
+
+def mul(a, b):
+    """a * b mod p for two batches of field elements"""
+    n = a.shape[1]
+    # all the 64 products of limbs at once, split in their low and high 32 bits
+    products = a[:, None, :] * b[None, :, :]
+    # shift row i right by i columns, then summing the rows adds up the products of the same weight
+    shifted = np.zeros((2, NUM_LIMBS, 2 * NUM_LIMBS, n), dtype=np.uint64)
+    np.bitwise_and(products, np.uint64(LIMB_MASK), out=shifted[0, :, :NUM_LIMBS])
+    np.right_shift(products, np.uint64(LIMB_BITS), out=shifted[1, :, :NUM_LIMBS])
+    diagonals = shifted.reshape(2, 2 * NUM_LIMBS * NUM_LIMBS, n)[:, :NUM_LIMBS * (2 * NUM_LIMBS - 1)]
+    low, high = diagonals.reshape(2, NUM_LIMBS, 2 * NUM_LIMBS - 1, n).sum(axis=1)
+    # 16 columns of the 512 bit product, each < 2^36
+    columns = np.zeros((2 * NUM_LIMBS, n), dtype=np.uint64)
+    columns[:2 * NUM_LIMBS - 1] += low
+    columns[1:] += high
+    columns = carry(list(columns))
+    # fold the high 256 bits: H * 2^256 = H * (2^32 + 977) mod p
+    low_half, high_half = columns[:NUM_LIMBS], columns[NUM_LIMBS:]
+    limbs = [low_half[i] + high_half[i] * 977 for i in range(NUM_LIMBS)] + [np.zeros(n, dtype=np.uint64)]
+    for i in range(NUM_LIMBS):
+        limbs[i + 1] += high_half[i]
+    return reduce(carry(limbs))
+
+
+def square(a):
+    """a² mod p for a batch of field elements"""
+    return mul(a, a)
+
+
+# -------------------------
+# Batched point arithmetic
+# -------------------------
+
+def limb_table(table):
+    """Convert a fixed-base table to two arrays of limbs (x and y), of shape (rows, 8, row size + 1).
+
+    Column 0 of every row is a dummy point, picked by the zero digits and then ignored."""
+    key = id(table)
+    entry = _limb_tables.get(key)
+    if entry is not None:
+        _limb_tables.move_to_end(key)
+        return entry[1]
+    row_size = len(table[0])
+    xs, ys = [], []
+    for row in table:
+        points = [row[0]] + [row[j] for j in range(row_size)]
+        xs.append(to_limbs([x for x, _ in points]))
+        ys.append(to_limbs([y for _, y in points]))
+    limbs = np.stack(xs), np.stack(ys)
+    # keep the table itself in the cache, so its id can't be reused by another object
+    _limb_tables[key] = table, limbs
+    if len(_limb_tables) > LIMB_TABLE_CACHE_SIZE:
+        _limb_tables.popitem(last=False)
+    return limbs
+
+
+def digits_of(scalars, window: int, num_rows: int):
+    """Split every scalar (0 <= k < 2^256) in num_rows digits of window bits: array of shape (rows, N)"""
+    data = np.frombuffer(b''.join(k.to_bytes(32, 'little') for k in scalars), dtype=np.uint8)
+    bits = np.unpackbits(data.reshape(len(scalars), 32), axis=1, bitorder='little')
+    padding = num_rows * window - bits.shape[1]
+    if padding > 0:
+        bits = np.pad(bits, ((0, 0), (0, padding)))
+    bits = bits[:, :num_rows * window].reshape(len(scalars), num_rows, window).astype(np.int64)
+    return (bits << np.arange(window, dtype=np.int64)).sum(axis=2).T
+
+
+def add_affine(X1, Y1, Z1, x2, y2):
+    """Mixed addition of a batch of Jacobian points and a batch of affine points (same formulas of ECDSA.jacobian_add_affine)"""
+    Z1Z1 = square(Z1)
+    U2 = mul(x2, Z1Z1)
+    S2 = mul(y2, mul(Z1, Z1Z1))
+    H = sub(U2, X1)
+    R = sub(S2, Y1)
+    HH = square(H)
+    HHH = mul(H, HH)
+    V = mul(X1, HH)
+    X3 = sub(sub(square(R), HHH), mul_small(V, 2))
+    Y3 = sub(mul(R, sub(V, X3)), mul(Y1, HHH))
+    Z3 = mul(Z1, H)
+    return X3, Y3, Z3
+
+
+def multiply_fixed_base_many(scalars, table, window: int):
+    """Multiply the base point of a fixed-base table by many scalars (0 <= k < n), returning Jacobian int tuples.
+
+    The additions never hit the special cases of jacobian_add_affine (doubling or opposite points): the sum of
+    the first i rows is smaller than 2^(window * i) times the base point, while row i adds a multiple of it that
+    is at least as big, and the total is k < n. The only special case left is the point at infinity of the start."""
+    table_x, table_y = limb_table(table)
+    num_rows = len(table)
+    digits = digits_of(scalars, window, num_rows)
+    num_scalars = len(scalars)
+    X = np.zeros((NUM_LIMBS, num_scalars), dtype=np.uint64)
+    Y = np.zeros((NUM_LIMBS, num_scalars), dtype=np.uint64)
+    Z = np.zeros((NUM_LIMBS, num_scalars), dtype=np.uint64)
+    one = to_limbs([1] * num_scalars)
+    infinity = np.ones(num_scalars, dtype=bool)
+    for i in range(num_rows):
+        row_digits = digits[i]
+        active = row_digits != 0
+        if not active.any():
+            continue
+        x2 = table_x[i][:, row_digits]
+        y2 = table_y[i][:, row_digits]
+        X3, Y3, Z3 = add_affine(X, Y, Z, x2, y2)
+        # the first point of a sum is taken as it is, then the mixed additions
+        first = active & infinity
+        added = active & ~infinity
+        X = np.where(first, x2, np.where(added, X3, X))
+        Y = np.where(first, y2, np.where(added, Y3, Y))
+        Z = np.where(first, one, np.where(added, Z3, Z))
+        infinity &= ~active
+    result = []
+    for X_i, Y_i, Z_i, is_infinity in zip(from_limbs(X), from_limbs(Y), from_limbs(Z), infinity):
+        result.append((0, 1, 0) if is_infinity else (X_i, Y_i, Z_i))
+    return result
@@ -0,0 +1,86 @@
+from Tools import bytes_from_int, hash160
+
+# Definisco alcune costanti
+NUM_BYTE_32 = 32
+
+
+def ser_compressed(x: int, y: int) -> bytes:
+    """Serialize the point (x, y) in compressed form (02/03 + x)"""
+    prefix = b'\x02' if y % 2 == 0 else b'\x03'
+    return prefix + bytes_from_int(x, NUM_BYTE_32)
+
+
+def ser_uncompressed(x: int, y: int) -> bytes:
+    """Serialize the point (x, y) in uncompressed form (04 + x + y)"""
+    return b'\x04' + bytes_from_int(x, NUM_BYTE_32) + bytes_from_int(y, NUM_BYTE_32)
+
+
+class Point:
+    """An affine point (x, y) of the curve, immutable and usable as a tuple, that caches its serializations"""
+    __slots__ = ('x', 'y', '_compressed', '_uncompressed', '_x_only', '_hash160')
+
+    def __init__(self, x: int, y: int):
+        setattr_ = object.__setattr__
+        setattr_(self, 'x', x)
+        setattr_(self, 'y', y)
+        setattr_(self, '_compressed', None)
+        setattr_(self, '_uncompressed', None)
+        setattr_(self, '_x_only', None)
+        setattr_(self, '_hash160', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Point is immutable")
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, Point):
+            return self.x == other.x and self.y == other.y
+        if isinstance(other, tuple):
+            return (self.x, self.y) == other
+        return NotImplemented
+
+    def __hash__(self):
+        # same hash of the tuple (x, y), so points and tuples can be used as the same key
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Point({self.x}, {self.y})"
+
+    def __reduce__(self):
+        return Point, (self.x, self.y)
+
+    @property
+    def compressed(self) -> bytes:
+        """Serialization in compressed form (02/03 + x)"""
+        if self._compressed is None:
+            object.__setattr__(self, '_compressed', ser_compressed(self.x, self.y))
+        return self._compressed
+
+    @property
+    def uncompressed(self) -> bytes:
+        """Serialization in uncompressed form (04 + x + y)"""
+        if self._uncompressed is None:
+            object.__setattr__(self, '_uncompressed', ser_uncompressed(self.x, self.y))
+        return self._uncompressed
+
+    @property
+    def x_only(self) -> bytes:
+        """Serialization in schnorr format (x only, BIP-340)"""
+        if self._x_only is None:
+            object.__setattr__(self, '_x_only', bytes_from_int(self.x, NUM_BYTE_32))
+        return self._x_only
+
+    @property
+    def hash160(self) -> bytes:
+        """ripemd160(sha256(compressed serialization))"""
+        if self._hash160 is None:
+            object.__setattr__(self, '_hash160', hash160(self.compressed))
+        return self._hash160
@@ -1,8 +1,9 @@
 import secrets
 from hashlib import sha256
-from ECDSA import multiply, add
+from ECDSA import multiply, pubkey_from_privkey, multiply_many, as_point, multiply_joint, decompress_point, parse_public_key, multiply_generator_jacobian, multi_multiply_jacobian, jacobian_add
 from Keys import ser_public_key_schnorr
 from Tools import bytes_from_int, int_from_bytes
+import Instrumentation
 
 # -------------------------
 # Elliptic Curve Parameters
@@ -23,6 +24,12 @@ G = 5506626302227734366957871889516853432625060345377759417550018736038911672924
     32670510020758816978083085130507043184471273380659243275938904335757337482424
 
 NUM_BYTES_32 = 32
+# a BIP-340 signature: R (x-only, 32 bytes) and s (32 bytes)
+NUM_BYTES_SIGNATURE = 64
+
+# below this many signatures verify_schnorr_batch verifies them one at a time (measured: the batch
+# equation is ~0.9x the single verifications at 8 signatures, ~1.15x at 16)
+SCHNORR_BATCH_MIN_SIZE = 12
 
 
 def tagged_hash(tag: str, data: bytes) -> bytes:
@@ -32,41 +39,151 @@ def tagged_hash(tag: str, data: bytes) -> bytes:
 
 
 def lift_x(x: int) -> (int, int):
-    if x >= p:
-        return None
-    y_sq = (pow(x, 3, p) + 7) % p
-    y = pow(y_sq, (p + 1) // 4, p)
-    if pow(y, 2, p) != y_sq:
+    """Return the point with abscissa x and even y, None if it doesn't exist"""
+    return decompress_point(x, False)
+
+
+def parse_x_only_public_key(public_key: bytes) -> (int, int):
+    """Lift a 32-byte x-only public key to its point (even y), cached, None if it's not valid"""
+    if len(public_key) != 32:
         return None
-    return x, y if y & 1 == 0 else p - y
+    return parse_public_key(public_key)
 
 
-def sign_schnorr(private_key: int, msg: bytes, k=None) -> bytes:
-    """Sign a message with a priv key using Schnorr algorithm"""
-    P = multiply(private_key)
-    if not P[1] % 2 == 0:
-        private_key = n - private_key
-    if k is None:
-        k = secrets.randbelow(n)
-    R = multiply(k)
+class SchnorrKeypair:
+    """A private key and its BIP-340 public data (even-y key, x-only serialization), computed once"""
+    __slots__ = ('private_key', 'public_key', 'public_key_x_only', 'odd_y')
+
+    def __init__(self, private_key: int):
+        P = pubkey_from_privkey(private_key)
+        # BIP-340 keys have an even y: if it's odd, negate the private key (and the point, no need to multiply again)
+        self.odd_y = P[1] % 2 != 0
+        if self.odd_y:
+            private_key = n - private_key
+            P = as_point((P[0], p - P[1]))
+        self.private_key = private_key
+        self.public_key = P
+        self.public_key_x_only = P.x_only
+
+    def sign(self, msg: bytes, k=None, nonce_pool=None) -> bytes:
+        """Sign a message with this keypair"""
+        return sign_schnorr(self, msg, k, nonce_pool)
+
+    def sign_many(self, msgs: [bytes]) -> [bytes]:
+        """Sign many messages with this keypair, computing all the nonce points R with a single inversion"""
+        ks = [secrets.randbelow(n - 1) + 1 for _ in msgs]
+        return [sign_schnorr_with_nonce(self, msg, k, R) for msg, k, R in zip(msgs, ks, multiply_many(ks))]
+
+
+def sign_schnorr_with_nonce(keypair: SchnorrKeypair, msg: bytes, k: int, R: (int, int)) -> bytes:
+    """Sign a message with a keypair using Schnorr algorithm, given the nonce k and the point R = kG"""
     if not R[1] % 2 == 0:
         k = n - k
-    e = int_from_bytes(tagged_hash("BIP0340/challenge", ser_public_key_schnorr(R)\
-                                   + ser_public_key_schnorr(P) + msg))
-    sig = ser_public_key_schnorr(R) + bytes_from_int((k + e * private_key) % n, NUM_BYTES_32)
+    R_ser = ser_public_key_schnorr(R)
+    e = int_from_bytes(tagged_hash("BIP0340/challenge", R_ser + keypair.public_key_x_only + msg))
+    sig = R_ser + bytes_from_int((k + e * keypair.private_key) % n, NUM_BYTES_32)
     return sig
 
 
+def sign_schnorr(private_key: int, msg: bytes, k=None, nonce_pool=None) -> bytes:
+    """Sign a message with a priv key (an int or a SchnorrKeypair) using Schnorr algorithm.
+
+    If nonce_pool is given, the nonce and R = kG are taken from it."""
+    if isinstance(private_key, SchnorrKeypair):
+        keypair = private_key
+    else:
+        keypair = SchnorrKeypair(private_key)
+    if k is None and nonce_pool is not None:
+        k, R, _ = nonce_pool.pop()
+        return sign_schnorr_with_nonce(keypair, msg, k, R)
+    if k is None:
+        k = secrets.randbelow(n)
+    return sign_schnorr_with_nonce(keypair, msg, k, multiply(k))
+
+
 def verify_schnorr(public_key: bytes, msg: bytes, sig: bytes):
     """Verify a signature in relation of a message and a public key using Schnorr algorithm"""
-    R_ser256_bytes, s = sig
-    P = lift_x(int_from_bytes(public_key))
-    e = int_from_bytes(tagged_hash("BIP0340/challenge", R_ser256_bytes + public_key + msg)) % n
+    if len(sig) != NUM_BYTES_SIGNATURE:
+        return False
+    R_ser256_bytes, s = sig[:32], sig[32:]
+    P = parse_x_only_public_key(public_key)
+    if P is None:
+        return False
     s_int = int_from_bytes(s)
-    R = add(multiply(s_int), multiply(n - e, P))
+    if s_int >= n:
+        return False
+    e = int_from_bytes(tagged_hash("BIP0340/challenge", R_ser256_bytes + public_key + msg)) % n
+    R = multiply_joint(s_int, n - e, P)
+    if R is None:
+        return False
     if not R[1] % 2 == 0:
         return False
     r_int = int_from_bytes(R_ser256_bytes)
     if R[0] != r_int:
         return False
     return True
+
+
+def parse_schnorr_batch_item(public_key: bytes, msg: bytes, sig: bytes):
+    """Decode a (public_key, msg, sig) triple into (P, R, e, s) for batch verification, None if it's invalid"""
+    if len(sig) != NUM_BYTES_SIGNATURE:
+        return None
+    P = parse_x_only_public_key(public_key)
+    if P is None:
+        return None
+    R = lift_x(int_from_bytes(sig[:32]))
+    if R is None:
+        return None
+    s = int_from_bytes(sig[32:])
+    if s >= n:
+        return None
+    e = int_from_bytes(tagged_hash("BIP0340/challenge", sig[:32] + public_key + msg)) % n
+    return P, R, e, s
+
+
+def schnorr_batch_equation(entries) -> bool:
+    """Check (a1*s1 + a2*s2 + ...) * G == a1*R1 + a1*e1*P1 + a2*R2 + a2*e2*P2 + ... with random weights a2, a3, ..."""
+    s_sum = 0
+    scalars = []
+    points = []
+    for i, (P, R, e, s) in enumerate(entries):
+        a = 1 if i == 0 else secrets.randbelow(n - 1) + 1
+        s_sum += a * s
+        # move everything on the same side: the total must be the point at infinity
+        scalars.append(n - a)
+        points.append(R)
+        scalars.append(n - (a * e) % n)
+        points.append(P)
+    total = jacobian_add(multiply_generator_jacobian(s_sum), multi_multiply_jacobian(scalars, points))
+    return total[2] == 0
+
+
+def verify_schnorr_batch(items) -> [bool]:
+    """Verify many (public_key, msg, sig) triples at once following BIP-340 batch verification.
+
+    When the whole batch doesn't verify, it's split in halves until the bad signatures are located. Batches (and
+    halves) smaller than SCHNORR_BATCH_MIN_SIZE are verified one signature at a time, which is faster."""
+    items = list(items)
+    entries = [parse_schnorr_batch_item(public_key, msg, sig) for public_key, msg, sig in items]
+    results = [entry is not None for entry in entries]
+    pending = [[i for i, entry in enumerate(entries) if entry is not None]]
+    while pending:
+        indexes = pending.pop()
+        if len(indexes) < SCHNORR_BATCH_MIN_SIZE:
+            for i in indexes:
+                results[i] = verify_schnorr(*items[i])
+            continue
+        if schnorr_batch_equation([entries[i] for i in indexes]):
+            continue
+        middle = len(indexes) // 2
+        pending.append(indexes[:middle])
+        pending.append(indexes[middle:])
+    return results
+
+
+# functions counted by Instrumentation when it's enabled, with their category
+Instrumentation.register(__name__, {
+    'sign_schnorr_with_nonce': 'schnorr_signs',
+    'verify_schnorr': 'schnorr_verifies',
+    'schnorr_batch_equation': 'schnorr_batch_equations',
+})
@@ -1,9 +1,22 @@
 import hashlib
+import struct
 from hashlib import sha256
 
 # Definisco alcune costanti
 NUM_BYTES_32 = 32
 
+# precompiled little endian formats of the integer fields of a transaction
+UINT8 = struct.Struct('<B')
+UINT16_LE = struct.Struct('<H')
+UINT32_LE = struct.Struct('<I')
+INT32_LE = struct.Struct('<i')
+UINT64_LE = struct.Struct('<Q')
+
+# first byte of a compact size on 3, 5 and 9 bytes
+COMPACT_SIZE_UINT16 = 0xfd
+COMPACT_SIZE_UINT32 = 0xfe
+COMPACT_SIZE_UINT64 = 0xff
+
 
 def bytes_from_int_reversed(x: int, num_byte: int) -> bytes:
     """Transform an int input into its (num_byte)-byte representation and then reverse byte order"""
@@ -25,18 +38,34 @@ def reverse_byte_order(b: bytes) -> bytes:
     return b[::-1]
 
 
+def compact_size_of(value: int) -> bytes:
+    """Encode an integer as a compact size (1, 3, 5 or 9 bytes, little endian)"""
+    if value < COMPACT_SIZE_UINT16:
+        return UINT8.pack(value)
+    elif value <= 0xffff:
+        return b'\xfd' + UINT16_LE.pack(value)
+    elif value <= 0xffffffff:
+        return b'\xfe' + UINT32_LE.pack(value)
+    else:
+        return b'\xff' + UINT64_LE.pack(value)
+
+
+def read_compact_size(buffer, offset: int) -> (int, int):
+    """Decode the compact size at offset of a buffer: return its value and the offset of the following byte"""
+    first = buffer[offset]
+    if first < COMPACT_SIZE_UINT16:
+        return first, offset + 1
+    elif first == COMPACT_SIZE_UINT16:
+        return UINT16_LE.unpack_from(buffer, offset + 1)[0], offset + 3
+    elif first == COMPACT_SIZE_UINT32:
+        return UINT32_LE.unpack_from(buffer, offset + 1)[0], offset + 5
+    else:
+        return UINT64_LE.unpack_from(buffer, offset + 1)[0], offset + 9
+
+
 def compact_size(data: bytes) -> bytes:
     """Return the compact size of the data, that is a byte representing an integer"""
-    len_data = len(data)
-    len_data_bytes = bytes_from_int(len_data, NUM_BYTES_32)
-    if len_data < 252:
-        return len_data_bytes[-1:]
-    elif len_data < 65535:
-        return b'\xfd' + len_data_bytes[-2:]
-    elif len_data < 4294967295:
-        return b'\xfe' + len_data_bytes[-4:]
-    elif len_data < 18446744073709551615:
-        return b'\xff' + len_data_bytes[-8:]
+    return compact_size_of(len(data))
 
 
 def sha256_2(data: bytes) -> bytes:
@@ -69,5 +98,69 @@ def DER_encoding(signature: (bytes, bytes)) -> bytes:
     return compound_object + total_lenght + result
 
 
+class TxWriter:
+    """Serialize a transaction (or a sighash preimage) appending its fields to a single growing bytearray.
+
+    Every write method returns the writer itself, so calls can be chained."""
+    __slots__ = ('buffer',)
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def write(self, *chunks: bytes) -> 'TxWriter':
+        """Append raw bytes"""
+        for chunk in chunks:
+            self.buffer += chunk
+        return self
+
+    def write_reversed(self, data: bytes) -> 'TxWriter':
+        """Append bytes in reverse order (e.g. a txid)"""
+        self.buffer += data[::-1]
+        return self
+
+    def write_uint8(self, value: int) -> 'TxWriter':
+        """Append a 1-byte unsigned integer"""
+        self.buffer += UINT8.pack(value)
+        return self
+
+    def write_uint32(self, value: int) -> 'TxWriter':
+        """Append a 4-byte little endian unsigned integer (vout, sequence, locktime)"""
+        self.buffer += UINT32_LE.pack(value)
+        return self
+
+    def write_int32(self, value: int) -> 'TxWriter':
+        """Append a 4-byte little endian signed integer (version)"""
+        self.buffer += INT32_LE.pack(value)
+        return self
+
+    def write_uint64(self, value: int) -> 'TxWriter':
+        """Append an 8-byte little endian unsigned integer (amount)"""
+        self.buffer += UINT64_LE.pack(value)
+        return self
+
+    def write_compact_size(self, value: int) -> 'TxWriter':
+        """Append an integer encoded as a compact size"""
+        self.buffer += compact_size_of(value)
+        return self
+
+    def write_var_bytes(self, *chunks: bytes) -> 'TxWriter':
+        """Append every chunk preceded by its length as a compact size (scripts, witness elements)"""
+        for chunk in chunks:
+            self.buffer += compact_size_of(len(chunk))
+            self.buffer += chunk
+        return self
+
+    def getbuffer(self) -> memoryview:
+        """Return a view of the serialized bytes, without copying them (the writer can't grow while it's alive)"""
+        return memoryview(self.buffer)
+
+    def getvalue(self) -> bytes:
+        """Return the serialized bytes"""
+        return bytes(self.buffer)
+
+
 if __name__ == '__main__':
     print("ciao")
\ No newline at end of file
@@ -0,0 +1,485 @@
+import struct
+from hashlib import sha256
+from Tools import read_compact_size, sha256_2, TxWriter, INT32_LE, UINT32_LE, UINT64_LE
+
+# -------------------------------------------------------------------------- #
+#
+# Lazy parser of raw transactions
+#
+# TransactionView wraps bytes, a memoryview or an mmap'd buffer without
+# copying it. The first access to inputs, outputs, witnesses or locktime
+# walks the transaction once and records only the offsets of its parts;
+# every field is then decoded from the original buffer when it's read.
+# Scripts and witness items are returned as memoryviews of the buffer.
+#
+# Tx, TxIn, TxOut and Witness are the mutable object model of a transaction.
+# Serializations, txid, wtxid, sizes and the hashes of the signature messages
+# are computed on first use and cached; setting any field of a part drops the
+# cached values of that part and of the parts containing it.
+#
+# -------------------------------------------------------------------------- #
+
+# bytes of the fixed-size fields
+NUM_BYTES_VERSION = 4
+NUM_BYTES_OUTPOINT = 36
+NUM_BYTES_SEQUENCE = 4
+NUM_BYTES_AMOUNT = 8
+NUM_BYTES_LOCKTIME = 4
+
+# marker and flag of a segwit transaction (BIP-144)
+SEGWIT_MARKER = 0x00
+SEGWIT_FLAG = 0x01
+
+
+def as_byte_view(buffer) -> memoryview:
+    """A flat memoryview of unsigned bytes over buffer (no copy)"""
+    view = memoryview(buffer)
+    return view if view.format == 'B' and view.ndim == 1 else view.cast('B')
+
+
+class TxInView:
+    """An input of a TransactionView, decoded from the buffer on access"""
+    __slots__ = ('buffer', 'offset', 'script_offset', 'script_length')
+
+    def __init__(self, buffer, offset: int, script_offset: int, script_length: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.script_offset = script_offset
+        self.script_length = script_length
+
+    @property
+    def txid_reversed(self) -> memoryview:
+        """txid of the spent output, in the byte order of the transaction (little endian)"""
+        return self.buffer[self.offset:self.offset + 32]
+
+    @property
+    def txid(self) -> bytes:
+        """txid of the spent output, in the usual (big endian) order"""
+        return bytes(self.txid_reversed)[::-1]
+
+    @property
+    def vout(self) -> int:
+        """Index of the spent output"""
+        return UINT32_LE.unpack_from(self.buffer, self.offset + 32)[0]
+
+    @property
+    def unlocking_script(self) -> memoryview:
+        """scriptSig of the input"""
+        return self.buffer[self.script_offset:self.script_offset + self.script_length]
+
+    @property
+    def sequence(self) -> int:
+        """nSequence of the input"""
+        return UINT32_LE.unpack_from(self.buffer, self.script_offset + self.script_length)[0]
+
+
+class TxOutView:
+    """An output of a TransactionView, decoded from the buffer on access"""
+    __slots__ = ('buffer', 'offset', 'script_offset', 'script_length')
+
+    def __init__(self, buffer, offset: int, script_offset: int, script_length: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.script_offset = script_offset
+        self.script_length = script_length
+
+    @property
+    def amount(self) -> int:
+        """Value of the output in sats"""
+        return UINT64_LE.unpack_from(self.buffer, self.offset)[0]
+
+    @property
+    def locking_script(self) -> memoryview:
+        """scriptPubKey of the output"""
+        return self.buffer[self.script_offset:self.script_offset + self.script_length]
+
+
+class WitnessView:
+    """The witness of an input: a sequence of items (memoryviews of the buffer), decoded on access"""
+    __slots__ = ('buffer', 'offset', 'end', '_items')
+
+    def __init__(self, buffer, offset: int, end: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.end = end
+        self._items = None
+
+    @property
+    def items(self) -> [memoryview]:
+        """The items of the witness (signatures, public keys, scripts, ...)"""
+        if self._items is None:
+            count, offset = read_compact_size(self.buffer, self.offset)
+            items = []
+            for _ in range(count):
+                length, offset = read_compact_size(self.buffer, offset)
+                items.append(self.buffer[offset:offset + length])
+                offset += length
+            self._items = items
+        return self._items
+
+    @property
+    def raw(self) -> memoryview:
+        """The serialized witness (item count and items)"""
+        return self.buffer[self.offset:self.end]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+
+class TransactionView:
+    """A raw transaction read in place from a buffer, its fields decoded only when they're accessed"""
+    __slots__ = ('buffer', '_inputs', '_outputs', '_witnesses', '_locktime_offset')
+
+    def __init__(self, buffer):
+        self.buffer = as_byte_view(buffer)
+        self._inputs = None
+        self._outputs = None
+        self._witnesses = None
+        self._locktime_offset = None
+
+    @property
+    def version(self) -> int:
+        """nVersion of the transaction"""
+        if len(self.buffer) < NUM_BYTES_VERSION:
+            raise ValueError("truncated transaction")
+        return INT32_LE.unpack_from(self.buffer, 0)[0]
+
+    @property
+    def segwit(self) -> bool:
+        """True if the transaction is serialized with marker, flag and witnesses"""
+        return len(self.buffer) > 5 and self.buffer[4] == SEGWIT_MARKER and self.buffer[5] == SEGWIT_FLAG
+
+    def scan(self):
+        """Walk the transaction once, recording the offsets of inputs, outputs, witnesses and locktime"""
+        if self._locktime_offset is not None:
+            return
+        buffer = self.buffer
+        try:
+            offset = NUM_BYTES_VERSION + (2 if self.segwit else 0)
+            inputs = []
+            count, offset = read_compact_size(buffer, offset)
+            for _ in range(count):
+                length, script_offset = read_compact_size(buffer, offset + NUM_BYTES_OUTPOINT)
+                inputs.append(TxInView(buffer, offset, script_offset, length))
+                offset = script_offset + length + NUM_BYTES_SEQUENCE
+            outputs = []
+            count, offset = read_compact_size(buffer, offset)
+            for _ in range(count):
+                length, script_offset = read_compact_size(buffer, offset + NUM_BYTES_AMOUNT)
+                outputs.append(TxOutView(buffer, offset, script_offset, length))
+                offset = script_offset + length
+            witnesses = []
+            if self.segwit:
+                for _ in inputs:
+                    start = offset
+                    count, offset = read_compact_size(buffer, offset)
+                    for _ in range(count):
+                        length, offset = read_compact_size(buffer, offset)
+                        offset += length
+                    witnesses.append(WitnessView(buffer, start, offset))
+        except (IndexError, struct.error):
+            raise ValueError("truncated transaction")
+        if offset + NUM_BYTES_LOCKTIME > len(buffer):
+            raise ValueError("truncated transaction")
+        self._inputs = inputs
+        self._outputs = outputs
+        self._witnesses = witnesses
+        self._locktime_offset = offset
+
+    @property
+    def inputs(self) -> [TxInView]:
+        """The inputs of the transaction"""
+        self.scan()
+        return self._inputs
+
+    @property
+    def outputs(self) -> [TxOutView]:
+        """The outputs of the transaction"""
+        self.scan()
+        return self._outputs
+
+    @property
+    def witnesses(self) -> [WitnessView]:
+        """The witnesses of the inputs (empty for a legacy transaction)"""
+        self.scan()
+        return self._witnesses
+
+    @property
+    def locktime(self) -> int:
+        """nLockTime of the transaction"""
+        self.scan()
+        return UINT32_LE.unpack_from(self.buffer, self._locktime_offset)[0]
+
+    @property
+    def size(self) -> int:
+        """Number of bytes of the transaction (the buffer can continue after it)"""
+        self.scan()
+        return self._locktime_offset + NUM_BYTES_LOCKTIME
+
+    @property
+    def raw(self) -> memoryview:
+        """The bytes of the transaction"""
+        return self.buffer[:self.size]
+
+
+def iter_transactions(buffer):
+    """Yield a TransactionView for every transaction of a buffer holding raw transactions one after the other"""
+    view = as_byte_view(buffer)
+    offset = 0
+    while offset < len(view):
+        tx = TransactionView(view[offset:])
+        offset += tx.size
+        yield tx
+
+
+# -------------------------
+# Object model
+# -------------------------
+
+# witness scale factor of BIP-141: weight = base size * 3 + total size
+WITNESS_SCALE_FACTOR = 4
+
+DEFAULT_SEQUENCE = 0xffffffff
+
+
+class TxPart:
+    """Base of the parts of a transaction: setting a public attribute clears the cache here and in the owners"""
+    __slots__ = ('_owner', '_cache')
+
+    def __init__(self):
+        self._owner = None
+        self._cache = {}
+
+    def __setattr__(self, name, value):
+        if name[0] != '_':
+            value = self.adopt(name, value)
+            self.invalidate()
+        object.__setattr__(self, name, value)
+
+    def adopt(self, name: str, value):
+        """Normalize the value of a public attribute before it's set (and make this part the owner of its sub-parts)"""
+        return value
+
+    def invalidate(self):
+        """Drop the cached values of this part and of every part containing it"""
+        part = self
+        while part is not None:
+            part._cache.clear()
+            part = part._owner
+
+    def cached(self, key: str, compute):
+        """The cached value of key, computed with compute() if missing"""
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+
+
+class Witness(TxPart):
+    """The witness of an input: a sequence of items (signatures, public keys, scripts, ...)"""
+    __slots__ = ('items',)
+
+    def __init__(self, items=()):
+        super().__init__()
+        self.items = items
+
+    def adopt(self, name: str, value):
+        return tuple(bytes(item) for item in value) if name == 'items' else value
+
+    def serialize(self) -> bytes:
+        """Item count and items, every one prefixed by its compact size"""
+        return self.cached('serialized', lambda: TxWriter()
+                           .write_compact_size(len(self.items)).write_var_bytes(*self.items).getvalue())
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class TxIn(TxPart):
+    """An input: the spent output (txid, vout), scriptSig, nSequence and witness"""
+    __slots__ = ('txid', 'vout', 'unlocking_script', 'sequence', 'witness')
+
+    def __init__(self, txid: bytes, vout: int, unlocking_script=b'', sequence=DEFAULT_SEQUENCE, witness=None):
+        super().__init__()
+        self.txid = txid
+        self.vout = vout
+        self.unlocking_script = unlocking_script
+        self.sequence = sequence
+        self.witness = witness
+
+    def adopt(self, name: str, value):
+        if name == 'witness':
+            value = Witness() if value is None else value
+            value._owner = self
+        elif name in ('txid', 'unlocking_script'):
+            value = bytes(value)
+        return value
+
+    @property
+    def outpoint(self) -> bytes:
+        """txid (reversed) and vout of the spent output, as serialized in the transaction"""
+        return self.cached('outpoint', lambda: self.txid[::-1] + UINT32_LE.pack(self.vout))
+
+    def serialize(self) -> bytes:
+        """The input without its witness"""
+        return self.cached('serialized', lambda: TxWriter()
+                           .write(self.outpoint).write_var_bytes(self.unlocking_script).write_uint32(self.sequence)
+                           .getvalue())
+
+
+class TxOut(TxPart):
+    """An output: amount in sats and scriptPubKey"""
+    __slots__ = ('amount', 'locking_script')
+
+    def __init__(self, amount: int, locking_script: bytes):
+        super().__init__()
+        self.amount = amount
+        self.locking_script = locking_script
+
+    def adopt(self, name: str, value):
+        return bytes(value) if name == 'locking_script' else value
+
+    def serialize(self) -> bytes:
+        """Amount and locking script, as serialized in the transaction"""
+        return self.cached('serialized', lambda: TxWriter()
+                           .write_uint64(self.amount).write_var_bytes(self.locking_script).getvalue())
+
+
+class Tx(TxPart):
+    """A transaction: version, inputs, outputs and locktime (the witnesses belong to the inputs)"""
+    __slots__ = ('version', 'inputs', 'outputs', 'locktime')
+
+    def __init__(self, version=1, inputs=(), outputs=(), locktime=0):
+        super().__init__()
+        self.version = version
+        self.inputs = inputs
+        self.outputs = outputs
+        self.locktime = locktime
+
+    def adopt(self, name: str, value):
+        # inputs and outputs are tuples, so they can only change by setting the attribute
+        if name in ('inputs', 'outputs'):
+            value = tuple(value)
+            for part in value:
+                part._owner = self
+        return value
+
+    @classmethod
+    def from_view(cls, view: TransactionView) -> 'Tx':
+        """Copy the fields of a parsed transaction"""
+        witnesses = view.witnesses or [None] * len(view.inputs)
+        tx = cls(view.version,
+                 [TxIn(txin.txid, txin.vout, txin.unlocking_script, txin.sequence,
+                       None if witness is None else Witness(witness.items))
+                  for txin, witness in zip(view.inputs, witnesses)],
+                 [TxOut(txout.amount, txout.locking_script) for txout in view.outputs],
+                 view.locktime)
+        # the bytes it was read from are its serialization: no need to write it again to hash it
+        tx._cache['serialized_witness'] = bytes(view.raw)
+        return tx
+
+    @classmethod
+    def parse(cls, buffer) -> 'Tx':
+        """Read a raw transaction"""
+        return cls.from_view(TransactionView(buffer))
+
+    def add_input(self, txin: TxIn) -> TxIn:
+        self.inputs = self.inputs + (txin,)
+        return txin
+
+    def add_output(self, txout: TxOut) -> TxOut:
+        self.outputs = self.outputs + (txout,)
+        return txout
+
+    @property
+    def segwit(self) -> bool:
+        """True if some input has a witness, so the transaction is serialized with marker and flag (BIP-144)"""
+        return any(len(txin.witness) for txin in self.inputs)
+
+    def serialize_legacy_parts(self, writer: TxWriter) -> TxWriter:
+        """Write the input count, inputs, output count and outputs"""
+        return writer\
+            .write_compact_size(len(self.inputs)).write(*[txin.serialize() for txin in self.inputs])\
+            .write_compact_size(len(self.outputs)).write(*[txout.serialize() for txout in self.outputs])
+
+    def serialize(self) -> bytes:
+        """The transaction without marker, flag and witnesses (the bytes hashed by the txid)"""
+        return self.cached('serialized', lambda: self.serialize_legacy_parts(TxWriter().write_int32(self.version))
+                           .write_uint32(self.locktime).getvalue())
+
+    def serialize_witness(self) -> bytes:
+        """The transaction with marker, flag and witnesses if it has any (the bytes hashed by the wtxid)"""
+        if not self.segwit:
+            return self.serialize()
+        return self.cached('serialized_witness', lambda: self.serialize_legacy_parts(
+            TxWriter().write_int32(self.version).write_uint8(SEGWIT_MARKER).write_uint8(SEGWIT_FLAG))
+                           .write(*[txin.witness.serialize() for txin in self.inputs])
+                           .write_uint32(self.locktime).getvalue())
+
+    @property
+    def txid(self) -> bytes:
+        """Id of the transaction, in the usual (big endian) order"""
+        return self.cached('txid', lambda: sha256_2(self.serialize())[::-1])
+
+    @property
+    def wtxid(self) -> bytes:
+        """Id of the transaction including the witnesses (BIP-141), in the usual (big endian) order"""
+        return self.cached('wtxid', lambda: sha256_2(self.serialize_witness())[::-1])
+
+    @property
+    def size(self) -> int:
+        """Number of bytes of the complete serialization"""
+        return len(self.serialize_witness())
+
+    @property
+    def weight(self) -> int:
+        """Weight units (BIP-141)"""
+        return len(self.serialize()) * (WITNESS_SCALE_FACTOR - 1) + self.size
+
+    @property
+    def vsize(self) -> int:
+        """Virtual size in vbytes: the weight divided by 4, rounded up"""
+        return -(-self.weight // WITNESS_SCALE_FACTOR)
+
+    # hashes of the signature messages (BIP-143 and BIP-341), the same for every input
+
+    @property
+    def sha_prevouts(self) -> bytes:
+        """sha256 of the outpoints of all inputs (BIP-341)"""
+        return self.cached('sha_prevouts', lambda: sha256(b''.join(txin.outpoint for txin in self.inputs)).digest())
+
+    @property
+    def sha_sequences(self) -> bytes:
+        """sha256 of the nSequence of all inputs (BIP-341)"""
+        return self.cached('sha_sequences', lambda: sha256(b''.join(
+            UINT32_LE.pack(txin.sequence) for txin in self.inputs)).digest())
+
+    @property
+    def sha_outputs(self) -> bytes:
+        """sha256 of all outputs (BIP-341)"""
+        return self.cached('sha_outputs', lambda: sha256(b''.join(
+            txout.serialize() for txout in self.outputs)).digest())
+
+    @property
+    def hash_prevouts(self) -> bytes:
+        """sha256^2 of the outpoints of all inputs (BIP-143)"""
+        return self.cached('hash_prevouts', lambda: sha256(self.sha_prevouts).digest())
+
+    @property
+    def hash_sequence(self) -> bytes:
+        """sha256^2 of the nSequence of all inputs (BIP-143)"""
+        return self.cached('hash_sequence', lambda: sha256(self.sha_sequences).digest())
+
+    @property
+    def hash_outputs(self) -> bytes:
+        """sha256^2 of all outputs (BIP-143)"""
+        return self.cached('hash_outputs', lambda: sha256(self.sha_outputs).digest())
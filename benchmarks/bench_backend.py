@@ -0,0 +1,62 @@
+import json
+import os
+import secrets
+import subprocess
+import sys
+from timeit import timeit
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: plain Python ints against gmpy2 for multiply, sign
+# and verify. The backend is chosen when ECDSA is imported, so
+# every backend runs in its own process (--child).
+#
+# -------------------------------------------------------------- #
+
+NUM_ROUNDS = 50
+BACKENDS = ["python", "gmpy2"]
+
+
+def run_child():
+    """Time the operations with the backend of this process and print the results as JSON"""
+    from Backend import BACKEND
+    from ECDSA import n, multiply, sign, verify
+
+    d = secrets.randbelow(n - 1) + 1
+    P = multiply(d)
+    scalars = [secrets.randbelow(n - 1) + 1 for _ in range(NUM_ROUNDS)]
+    msgs = [secrets.token_bytes(32) for _ in range(NUM_ROUNDS)]
+    sigs = [sign(d, msg) for msg in msgs]
+    assert all(verify(P, msg, sig) for msg, sig in zip(msgs, sigs))
+
+    def per_op(func):
+        return timeit(func, number=1) / NUM_ROUNDS * 1e6
+
+    print(json.dumps({
+        "backend": BACKEND,
+        "multiply (k * G)": per_op(lambda: [multiply(k) for k in scalars]),
+        "multiply (k * P)": per_op(lambda: [multiply(k, P) for k in scalars]),
+        "sign": per_op(lambda: [sign(d, msg) for msg in msgs]),
+        "verify": per_op(lambda: [verify(P, msg, sig) for msg, sig in zip(msgs, sigs)]),
+    }))
+
+
+if __name__ == '__main__':
+    if "--child" in sys.argv:
+        run_child()
+        sys.exit()
+    results = {}
+    for backend in BACKENDS:
+        env = dict(os.environ, CORSO_BITCOIN_BACKEND=backend)
+        child = subprocess.run([sys.executable, __file__, "--child"], env=env, capture_output=True, text=True)
+        if child.returncode != 0:
+            print(f"{backend}: not available ({child.stderr.strip().splitlines()[-1]})")
+            continue
+        results[backend] = json.loads(child.stdout)
+    operations = [key for key in next(iter(results.values())) if key != "backend"]
+    print(f"{'':<20}" + "".join(f"{backend:>14}" for backend in results))
+    for operation in operations:
+        print(f"{operation:<20}" + "".join(f"{results[backend][operation]:>11.1f} µs" for backend in results))
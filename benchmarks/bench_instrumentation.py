@@ -0,0 +1,101 @@
+import os
+import secrets
+import sys
+from timeit import timeit
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ECDSA  # noqa: E402
+import Instrumentation  # noqa: E402
+import Schnorr  # noqa: E402
+from ECDSA import n, multiply, sign, verify  # noqa: E402
+from Schnorr import SchnorrKeypair, sign_schnorr, verify_schnorr  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: cost of the instrumentation counters
+#
+# First the property itself: after disable() every registered
+# function (and every copy imported by name in a known module) is
+# the original object again, so disabled counters cost nothing.
+# Then the same operations timed before the counters are ever turned
+# on, with the counters on and after turning them off again: the
+# three states are interleaved and repeated ROUNDS times, and the
+# best run of each is reported.
+#
+# -------------------------------------------------------------- #
+
+NUM_ROUNDS = 200
+ROUNDS = 5
+
+
+def registered_globals() -> dict:
+    """{(module name, global name): object} for every global of the known modules that is a registered function"""
+    functions = {id(getattr(sys.modules[module_name], name)) for module_name, name in Instrumentation._registered}
+    found = {}
+    for module_name in Instrumentation._modules:
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for name, value in vars(module).items():
+            if id(value) in functions:
+                found[module_name, name] = value
+    return found
+
+
+def bench(func, items):
+    """Time func over all the items and return the cost of a single call in µs"""
+    it = iter(items)
+    return timeit(lambda: func(*next(it)), number=len(items)) / len(items) * 1e6
+
+
+if __name__ == '__main__':
+    # multiply, sign and verify are imported by name here: count the calls made from this script too
+    Instrumentation.track(__name__)
+    private_key = secrets.randbelow(n - 1) + 1
+    public_key = multiply(private_key).compressed
+    keypair = SchnorrKeypair(private_key)
+    msgs = [secrets.token_bytes(32) for _ in range(NUM_ROUNDS)]
+    scalars = [(secrets.randbelow(n - 1) + 1,) for _ in range(NUM_ROUNDS)]
+    ecdsa_items = [(public_key, msg, sign(private_key, msg)) for msg in msgs]
+    schnorr_items = [(keypair.public_key_x_only, msg, sign_schnorr(keypair, msg)) for msg in msgs]
+
+    cases = (
+        ("multiply (k * G)", lambda k: multiply(k), scalars),
+        ("sign", lambda msg: sign(private_key, msg), [(msg,) for msg in msgs]),
+        ("verify", lambda *item: verify(*item), ecdsa_items),
+        ("verify_schnorr", lambda *item: verify_schnorr(*item), schnorr_items),
+    )
+    # timed before the counters are turned on for the first time
+    never_on = [min(bench(func, items) for _ in range(ROUNDS)) for _, func, items in cases]
+
+    # disabled counters leave no wrapper behind, in the defining modules and in the importing ones
+    originals = registered_globals()
+    assert ('ECDSA', 'verify') in originals and ('Schnorr', 'jacobian_add') in originals
+    Instrumentation.enable()
+    assert all(getattr(sys.modules[module_name], name) is not function
+               for (module_name, name), function in originals.items())
+    Instrumentation.disable()
+    assert all(getattr(sys.modules[module_name], name) is function
+               for (module_name, name), function in originals.items())
+    assert ECDSA.jacobian_add is Schnorr.jacobian_add
+    print(f"{len(originals)} registered globals are the original functions after disable()")
+
+    print(f"{'':<24} {'never on':>12} {'on':>12} {'off again':>12}")
+    for (label, func, items), before in zip(cases, never_on):
+        enabled = after = float('inf')
+        for _ in range(ROUNDS):
+            Instrumentation.enable()
+            enabled = min(enabled, bench(func, items))
+            Instrumentation.disable()
+            after = min(after, bench(func, items))
+        print(f"{label:<24} {before:10.1f}µs {enabled:10.1f}µs {after:10.1f}µs   "
+              f"overhead on: {enabled / before - 1:+.1%}, off: {after / before - 1:+.1%}")
+
+    Instrumentation.reset()
+    Instrumentation.enable()
+    verify(*ecdsa_items[0])
+    Instrumentation.disable()
+    print("one verify:", {category: entry['calls'] for category, entry in Instrumentation.stats().items()
+                          if entry['calls']})
@@ -0,0 +1,49 @@
+import os
+import secrets
+import sys
+from timeit import timeit
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ECDSA import n, multiply, pubkey_from_privkey, pubkey_cache_clear, pubkey_cache_stats  # noqa: E402
+from Keys import ser_public_key_compressed, ser_public_key_uncompressed, ser_public_key_schnorr  # noqa: E402
+from Tools import hash160  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: serializing (and hashing) the same public key again
+# and again, as a bare tuple or as a Point that caches the result,
+# and deriving it again from the same private key (LRU cache).
+#
+# -------------------------------------------------------------- #
+
+NUM_ROUNDS = 10000
+
+
+def bench(label, func):
+    """Time func NUM_ROUNDS times and print the cost of a single call"""
+    per_call = timeit(func, number=NUM_ROUNDS) / NUM_ROUNDS * 1e9
+    print(f"{label:<40} {per_call:10.1f} ns/op")
+
+
+if __name__ == '__main__':
+    point = multiply(secrets.randbelow(n - 1) + 1)
+    bare = tuple(point)
+    assert ser_public_key_compressed(bare) == ser_public_key_compressed(point) == point.compressed
+    assert ser_public_key_uncompressed(bare) == point.uncompressed
+    assert ser_public_key_schnorr(bare) == point.x_only
+    assert hash160(ser_public_key_compressed(bare)) == point.hash160
+
+    for label, public_key in (("tuple", bare), ("Point", point)):
+        bench(f"ser_public_key_compressed ({label})", lambda: ser_public_key_compressed(public_key))
+        bench(f"ser_public_key_uncompressed ({label})", lambda: ser_public_key_uncompressed(public_key))
+        bench(f"ser_public_key_schnorr ({label})", lambda: ser_public_key_schnorr(public_key))
+    bench("hash160(ser_public_key_compressed)", lambda: hash160(ser_public_key_compressed(bare)))
+    bench("Point.hash160", lambda: point.hash160)
+
+    private_key = secrets.randbelow(n - 1) + 1
+    bench("multiply(private_key)", lambda: multiply(private_key))
+    pubkey_cache_clear()
+    bench("pubkey_from_privkey (cached)", lambda: pubkey_from_privkey(private_key))
+    print(pubkey_cache_stats())
@@ -0,0 +1,184 @@
+import os
+import secrets
+import sys
+import tempfile
+from time import perf_counter
+from timeit import timeit
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ECDSA  # noqa: E402
+import NumpyField  # noqa: E402
+from ECDSA import G, n, double, add, multiply, multiply_many, configure_point_table_cache, point_table_cache_stats, \
+    from_jacobian, to_jacobian, jacobian_double, jacobian_add_affine, \
+    multiply_wnaf_jacobian, multiply_interleaved_jacobian, odd_multiples, glv_split, LAMBDA  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: cost of one scalar multiplication k * P
+#
+# Compare the old double & add in affine coordinates (one modular
+# inversion for every double/add) with the multiplication in
+# Jacobian coordinates (a single inversion at the end), and the
+# fixed-base path used for k * G with its precomputed table (built
+# in memory or memory-mapped from a table file).
+# Arbitrary points use width-w NAF, compared at w = 4 and w = 5,
+# with and without the GLV endomorphism (whose split and results
+# are first checked against the affine reference, on edge cases
+# and NUM_GLV_CHECKS random scalars).
+# Then k * P for a point with its own cached fixed-base table, and
+# finally many k * G at once, normalized with a single inversion,
+# with Python ints or with the NumPy limb arithmetic (if installed).
+#
+# -------------------------------------------------------------- #
+
+NUM_ROUNDS = 50
+NUM_GLV_CHECKS = 200
+
+
+def multiply_affine(k, point=G):
+    """Reference double & add in affine coordinates"""
+    current = point
+    binary_k = bin(k)[2:]
+    for bit in binary_k[1:]:
+        current = double(current)
+        if bit == "1":
+            current = add(current, point)
+    return current
+
+
+def multiply_binary(k, point=G):
+    """Reference double & add in Jacobian coordinates"""
+    current = to_jacobian(point)
+    for bit in bin(k)[3:]:
+        current = jacobian_double(current)
+        if bit == "1":
+            current = jacobian_add_affine(current, point)
+    return from_jacobian(current)
+
+
+def as_tuple(point):
+    """A Point as an (x, y) tuple (None stays None)"""
+    return None if point is None else tuple(point)
+
+
+def reference(k, point=G):
+    """k * point with the affine double & add, for any integer k (None for the point at infinity)"""
+    k %= n
+    return multiply_affine(k, point) if k else None
+
+
+def table_size(table):
+    """Approximate memory used by the table of G: lists, tuples and integers"""
+    size = sys.getsizeof(table)
+    for row in table:
+        size += sys.getsizeof(row)
+        for x, y in row:
+            size += sys.getsizeof((x, y)) + sys.getsizeof(x) + sys.getsizeof(y)
+    return size
+
+
+def bench(label, func, scalars):
+    """Time func over all the scalars and print the cost of a single call"""
+    it = iter(scalars)
+    seconds = timeit(lambda: func(next(it)), number=len(scalars))
+    per_call = seconds / len(scalars) * 1e6
+    print(f"{label:<40} {per_call:10.1f} µs/op")
+    return per_call
+
+
+if __name__ == '__main__':
+    start = perf_counter()
+    table = ECDSA.generator_table()
+    build_ms = (perf_counter() - start) * 1e3
+    num_points = sum(len(row) for row in table)
+    print(f"table of G (window {ECDSA.G_TABLE_WINDOW}): {num_points} points, built in {build_ms:.1f} ms, "
+          f"~{table_size(table) / 2 ** 20:.2f} MiB")
+
+    # cold start from a table file: map it and do a first multiplication
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "g_table.bin")
+        start = perf_counter()
+        ECDSA.save_generator_table(path)
+        build_file_ms = (perf_counter() - start) * 1e3
+        start = perf_counter()
+        mapped = ECDSA.load_generator_table(path)
+        load_ms = (perf_counter() - start) * 1e3
+        start = perf_counter()
+        k = secrets.randbelow(n - 1) + 1
+        first = ECDSA.multiply_fixed_base_jacobian(k, mapped, ECDSA.G_TABLE_FILE_WINDOW)
+        first_ms = (perf_counter() - start) * 1e3
+        assert from_jacobian(first) == tuple(multiply(k))
+        print(f"table of G from file (window {ECDSA.G_TABLE_FILE_WINDOW}): mapped in {load_ms:.1f} ms, "
+              f"first multiplication {first_ms:.2f} ms")
+        file_scalars = [secrets.randbelow(n - 1) + 1 for _ in range(NUM_ROUNDS)]
+        in_memory = bench("multiply (k * G)", multiply, file_scalars)
+        from_file = bench(f"multiply (k * G), table file w={ECDSA.G_TABLE_FILE_WINDOW}",
+                          lambda k: from_jacobian(ECDSA.multiply_fixed_base_jacobian(k, mapped,
+                                                                                     ECDSA.G_TABLE_FILE_WINDOW)),
+                          file_scalars)
+        print(f"building the table of window {ECDSA.G_TABLE_FILE_WINDOW} in memory would pay off after "
+              f"~{max(0, int(build_file_ms * 1e3 / max(in_memory - from_file, 1e-9)))} multiplications")
+
+    scalars = [secrets.randbelow(n - 1) + 1 for _ in range(NUM_ROUNDS)]
+    P = multiply_affine(secrets.randbelow(n - 1) + 1)
+
+    # results must be identical
+    for k in scalars[:5]:
+        assert tuple(multiply(k)) == multiply_affine(k)
+        assert tuple(multiply(k, P)) == multiply_affine(k, P)
+        assert from_jacobian(multiply_wnaf_jacobian(k, P, 4)) == multiply_affine(k, P)
+        assert from_jacobian(multiply_interleaved_jacobian([(k, odd_multiples(P, 5))])) == multiply_affine(k, P)
+
+    # GLV: the split is correct and short, and the results are identical to the reference
+    edge_scalars = [0, 1, 2, n - 1, n - 2, LAMBDA, n - LAMBDA, n, n + 3, -1, -5, -LAMBDA, 2 ** 128, 2 ** 255]
+    random_scalars = [secrets.randbelow(n) for _ in range(NUM_GLV_CHECKS)]
+    for k in edge_scalars + random_scalars:
+        k1, k2 = glv_split(k)
+        assert (k1 + k2 * LAMBDA - k) % n == 0
+        assert abs(k1) < 2 ** 129 and abs(k2) < 2 ** 129
+        expected = reference(k, P)
+        assert from_jacobian(multiply_wnaf_jacobian(k, P, 4)) == expected
+        assert from_jacobian(multiply_wnaf_jacobian(k, P, 5)) == expected
+        assert as_tuple(multiply(k, P)) == expected
+    for k in edge_scalars:
+        assert as_tuple(multiply(k)) == reference(k)
+
+    affine = bench("affine double & add (k * G)", multiply_affine, scalars)
+    jacobian = bench("multiply (k * G)", multiply, scalars)
+    print(f"speedup k * G: {affine / jacobian:.2f}x")
+    affine = bench("affine double & add (k * P)", lambda k: multiply_affine(k, P), scalars)
+    binary = bench("Jacobian double & add (k * P)", lambda k: multiply_binary(k, P), scalars)
+    for w in (4, 5):
+        plain = bench(f"wNAF w={w} (k * P)",
+                      lambda k: from_jacobian(multiply_interleaved_jacobian([(k, odd_multiples(P, w))])), scalars)
+        glv = bench(f"wNAF w={w} + GLV (k * P)", lambda k: from_jacobian(multiply_wnaf_jacobian(k, P, w)), scalars)
+        print(f"speedup k * P, w={w}: {affine / glv:.2f}x vs affine, {binary / plain:.2f}x wNAF vs double & add, "
+              f"{plain / glv:.2f}x GLV vs wNAF")
+
+    for window in (4, 8):
+        configure_point_table_cache(max_bytes=2 ** 24, window=window, min_uses=1)
+        # the first use builds the table
+        multiply(1, P)
+        cached = bench(f"multiply, cached table w={window} (k * P)", lambda k: multiply(k, P), scalars)
+        print(f"speedup k * P, cached table w={window}: {affine / cached:.2f}x vs affine")
+        print(point_table_cache_stats())
+        assert tuple(multiply(scalars[0], P)) == multiply_affine(scalars[0], P)
+    configure_point_table_cache(max_bytes=0)
+
+    start = perf_counter()
+    bulk = multiply_many(scalars)
+    per_key = (perf_counter() - start) / len(scalars) * 1e6
+    assert bulk == [multiply(k) for k in scalars]
+    print(f"{'multiply_many (k * G)':<40} {per_key:10.1f} µs/op")
+
+    # bulk key generation: scalar path vs NumPy limbs, on a batch as big as one chunk
+    if NumpyField.available():
+        pool = [secrets.randbelow(n - 1) + 1 for _ in range(ECDSA.VECTORIZED_CHUNK_SIZE)]
+        for vectorized in (False, True):
+            start = perf_counter()
+            keys = multiply_many(pool, vectorized=vectorized)
+            per_key = (perf_counter() - start) / len(pool) * 1e6
+            print(f"{f'multiply_many, vectorized={vectorized}':<40} {per_key:10.1f} µs/op")
+        assert keys == multiply_many(pool)
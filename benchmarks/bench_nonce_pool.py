@@ -0,0 +1,59 @@
+import os
+import secrets
+import sys
+import time
+from statistics import quantiles
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ECDSA import n, NoncePool, SigningKey, sign, verify  # noqa: E402
+from Schnorr import SchnorrKeypair, sign_schnorr, verify_schnorr  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: latency of a single signature (p50 / p99) for a
+# signing service, with and without a NoncePool. Requests arrive
+# with a small pause between them, which the pool uses to refill.
+#
+# -------------------------------------------------------------- #
+
+NUM_REQUESTS = 300
+PAUSE = 0.002
+
+
+def latencies(func, msgs):
+    """Call func on every message, pausing between requests, and return the latencies in µs"""
+    result = []
+    for msg in msgs:
+        start = time.perf_counter()
+        func(msg)
+        result.append((time.perf_counter() - start) * 1e6)
+        time.sleep(PAUSE)
+    return result
+
+
+def report(label, values):
+    """Print p50 and p99 of the latencies"""
+    percentiles = quantiles(values, n=100)
+    print(f"{label:<40} p50 {percentiles[49]:8.1f} µs   p99 {percentiles[98]:8.1f} µs")
+
+
+if __name__ == '__main__':
+    d = secrets.randbelow(n - 1) + 1
+    signing_key = SigningKey(d)
+    keypair = SchnorrKeypair(d)
+    msgs = [secrets.token_bytes(32) for _ in range(NUM_REQUESTS)]
+    pool = NoncePool()
+    # let the pool fill up before the first request
+    while len(pool) < pool.size:
+        time.sleep(0.01)
+
+    assert verify(signing_key.public_key, msgs[0], sign(signing_key, msgs[0], nonce_pool=pool))
+    assert verify_schnorr(keypair.public_key_x_only, msgs[0], sign_schnorr(keypair, msgs[0], nonce_pool=pool))
+
+    report("sign", latencies(lambda msg: sign(signing_key, msg), msgs))
+    report("sign (NoncePool)", latencies(lambda msg: sign(signing_key, msg, nonce_pool=pool), msgs))
+    report("sign_schnorr", latencies(lambda msg: sign_schnorr(keypair, msg), msgs))
+    report("sign_schnorr (NoncePool)", latencies(lambda msg: sign_schnorr(keypair, msg, nonce_pool=pool), msgs))
+    pool.close()
@@ -0,0 +1,80 @@
+import os
+import secrets
+import sys
+from time import perf_counter
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ECDSA import n, p, multiply  # noqa: E402
+from Keys import ser_public_key_schnorr  # noqa: E402
+from Schnorr import sign_schnorr, verify_schnorr, verify_schnorr_batch  # noqa: E402
+from Tools import bytes_from_int, int_from_bytes  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: amortized cost per signature of verify_schnorr_batch
+# at different batch sizes, against verify_schnorr one at a time.
+# A batch with some corrupted signatures checks that the bad ones
+# are located exactly (the results of verify_schnorr, item by item).
+#
+# -------------------------------------------------------------- #
+
+BATCH_SIZES = [1, 8, 16, 64, 256, 4096]
+
+# the one-at-a-time cost is measured on at most this many signatures
+MAX_SINGLE = 256
+
+
+def make_items(num):
+    """Create num valid (public_key, msg, sig) triples"""
+    items = []
+    for _ in range(num):
+        d = secrets.randbelow(n - 1) + 1
+        msg = secrets.token_bytes(32)
+        items.append((ser_public_key_schnorr(multiply(d)), msg, sign_schnorr(d, msg)))
+    return items
+
+
+def corrupt(items):
+    """Copy of items with a bad s, a wrong message, r >= p or a signature one byte short in some of them:
+    (items, indexes of the bad ones)"""
+    items = list(items)
+    bad = {}
+    for i in range(3, len(items), 37):
+        public_key, msg, sig = items[i]
+        r, s = sig[:32], int_from_bytes(sig[32:])
+        kind = len(bad) % 4
+        if kind == 0:
+            sig = r + bytes_from_int((s + 1) % n, 32)
+        elif kind == 1:
+            msg = bytes([msg[0] ^ 1]) + msg[1:]
+        elif kind == 2:
+            sig = bytes_from_int(p + int_from_bytes(r) % (2 ** 256 - p), 32) + sig[32:]
+        else:
+            sig = sig[:-1]
+        items[i] = public_key, msg, sig
+        bad[i] = kind
+    return items, set(bad)
+
+
+def per_signature(func, items):
+    """Run func(items) once and return the cost per signature in µs"""
+    start = perf_counter()
+    func(items)
+    return (perf_counter() - start) / len(items) * 1e6
+
+
+if __name__ == '__main__':
+    all_items = make_items(max(BATCH_SIZES))
+    for size in BATCH_SIZES:
+        items = all_items[:size]
+        assert all(verify_schnorr_batch(items))
+        bad_items, bad = corrupt(items[:MAX_SINGLE])
+        expected = [verify_schnorr(*item) for item in bad_items]
+        assert [i for i, valid in enumerate(expected) if not valid] == sorted(bad)
+        assert verify_schnorr_batch(bad_items) == expected
+        single = per_signature(lambda batch: [verify_schnorr(*item) for item in batch], items[:MAX_SINGLE])
+        batch = per_signature(verify_schnorr_batch, items)
+        print(f"batch size {size:>5}: {single:10.1f} µs/sig single, {batch:10.1f} µs/sig batch, "
+              f"speedup {single / batch:.2f}x")
@@ -0,0 +1,62 @@
+import os
+import secrets
+import sys
+from timeit import timeit
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ECDSA import n, SigningKey, NoncePool, sign, sign_grind, verify  # noqa: E402
+from Schnorr import SchnorrKeypair, sign_schnorr, verify_schnorr  # noqa: E402
+from Tools import DER_encoding  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: signing many messages with the same key, passing the
+# bare private key, a key object (public data computed once) or
+# using sign_many. Then the cost of "low-R" grinding.
+#
+# -------------------------------------------------------------- #
+
+NUM_MESSAGES = 100
+
+
+def bench(label, func):
+    """Run func once and print the cost of a single signature"""
+    per_sig = timeit(func, number=1) / NUM_MESSAGES * 1e6
+    print(f"{label:<40} {per_sig:10.1f} µs/sig")
+    return per_sig
+
+
+if __name__ == '__main__':
+    d = secrets.randbelow(n - 1) + 1
+    msgs = [secrets.token_bytes(32) for _ in range(NUM_MESSAGES)]
+    signing_key = SigningKey(d)
+    keypair = SchnorrKeypair(d)
+
+    assert all(verify(signing_key.public_key, msg, sig) for msg, sig in zip(msgs, signing_key.sign_many(msgs)))
+    assert all(verify_schnorr(keypair.public_key_x_only, msg, sig) for msg, sig in zip(msgs, keypair.sign_many(msgs)))
+
+    bench("sign (int)", lambda: [sign(d, msg) for msg in msgs])
+    bench("sign (SigningKey)", lambda: [sign(signing_key, msg) for msg in msgs])
+    bench("SigningKey.sign_many", lambda: signing_key.sign_many(msgs))
+    bench("sign_schnorr (int)", lambda: [sign_schnorr(d, msg) for msg in msgs])
+    bench("sign_schnorr (SchnorrKeypair)", lambda: [sign_schnorr(keypair, msg) for msg in msgs])
+    bench("SchnorrKeypair.sign_many", lambda: keypair.sign_many(msgs))
+
+    bench("sign (grind=True)", lambda: [sign(signing_key, msg, grind=True) for msg in msgs])
+    ground = [sign_grind(signing_key, msg) for msg in msgs]
+    nonce_pool = NoncePool()
+    ground_pool = [sign_grind(signing_key, msg, nonce_pool=nonce_pool) for msg in msgs]
+    nonce_pool.close()
+    # low-R signatures are valid and r < 2^255: once DER-encoded, r takes at most 32 bytes (no 0x00 padding)
+    for msg, (sig, _) in zip(msgs + msgs, ground + ground_pool):
+        assert verify(signing_key.public_key, msg, sig)
+        assert sig[0][0] < 0x80
+        der = DER_encoding(sig)
+        assert der[4] < 0x80 and der[3] <= 32
+    iterations = [it for _, it in ground]
+    plain_size = sum(len(DER_encoding(sign(d, msg))) for msg in msgs) / NUM_MESSAGES
+    ground_size = sum(len(DER_encoding(sig)) for sig, _ in ground) / NUM_MESSAGES
+    print(f"grinding: {sum(iterations) / NUM_MESSAGES:.2f} nonces per signature on average, max {max(iterations)}")
+    print(f"DER size: {plain_size:.2f} bytes -> {ground_size:.2f} bytes")
@@ -0,0 +1,321 @@
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import builtins
+from contextlib import redirect_stdout
+from timeit import default_timer
+
+# the course modules live in the root of the repository
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import ECDSA  # noqa: E402
+import Schnorr  # noqa: E402
+import Tools  # noqa: E402
+from Transaction import TransactionView, Tx, TxIn, TxOut, Witness  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# End-to-end benchmark of the eight spend flows (tx_*.py), and
+# regression check of the raw transactions they print.
+#
+#   python benchmarks/bench_transactions.py [--rounds N] [-o FILE]
+#
+# Every script runs in this process and its first line of output
+# (the signed transaction, deterministic thanks to the fixed nonce
+# k = 100) must be exactly the hex in EXPECTED_TX_HEX: any change
+# of the bytes makes the run fail with exit code 1.
+#
+# The functions a script imports by name are handed to it as
+# timed versions (the modules are untouched), so its time is split
+# in stages:
+# -keys: private -> public key derivation (and taproot tweaks)
+# -sighash: the hashes of the message to sign
+# -signing: ECDSA / Schnorr signatures
+# -serialization: everything else (scripts, encodings, addresses)
+# A call made inside another stage (e.g. the keypair built by
+# sign_schnorr) is counted in the outer one.
+#
+# The field by field breakdown printed after the transaction is
+# checked too, against the same fields read back by TransactionView,
+# and the raw transaction must round-trip through the Tx object model
+# (parsed and rebuilt from its parts), whose cached ids must follow
+# any change to an input or a witness.
+#
+# -------------------------------------------------------------- #
+
+DEFAULT_ROUNDS = 20
+
+EXPECTED_TX_HEX = {
+    'tx_legacy_P2PKH.py': (
+        "01000000013c3cac197259896f0b0af8c548c52511749248aebb4ebe866fbb4898986a1ce8010000006b483045022100ed3b"
+        "ace23c5e17652e174c835fb72bf53ee306b3406a26890221b4cef7500f880220254a832799c3ef35e91a39af8a30f69bf9a2"
+        "83af7bf7bfe9bbb9268e0090a2df01210246ebfb52e520b74148391333e3dd29db90bf3c32f21f1b07bc2fc2d4ebee9199ff"
+        "ffffff01a0a91000000000001976a914bfe9245401f8296878931281b14236e352bc443388ac00000000"
+    ),
+    'tx_legacy_P2SH.py': (
+        "010000000198ebde6c95586491159235893c4c50b189d70d5b3fd833483b9e5061cccaaa9600000000db00483045022100ed"
+        "3bace23c5e17652e174c835fb72bf53ee306b3406a26890221b4cef7500f88022056841f88a6220a2b8e01ec27c9ca98a2cc"
+        "b7ec8d4986c420e6537627a5a5851801483045022100ed3bace23c5e17652e174c835fb72bf53ee306b3406a26890221b4ce"
+        "f7500f88022040d4f53656df02e0963e5039e588d309613c5f908d38313f6bc3a3f756da4a2c014752210304b1f5be56c433"
+        "7d1486140c9f622de1b70eb6cc3a016fdd2d8e99b1ad12df852102d0675944a9b0bfa3f711e963dc6522e078595984db84dd"
+        "b818b43dfe216bcef852aeffffffff01d8572a00000000001976a914bfe9245401f8296878931281b14236e352bc443388ac"
+        "00000000"
+    ),
+    'tx_segwit_P2WPKH.py': (
+        "01000000000101abdca6b9c9045caccc48cdd92122335f9a521e0740f652b9aa333700919b554b0100000000ffffffff0110"
+        "27000000000000160014bfe9245401f8296878931281b14236e352bc443302483045022100ed3bace23c5e17652e174c835f"
+        "b72bf53ee306b3406a26890221b4cef7500f88022015caeedea4a48c35266d52f18386a7bcb40d6329caac14edd00a50e325"
+        "4f069901210246ebfb52e520b74148391333e3dd29db90bf3c32f21f1b07bc2fc2d4ebee919900000000"
+    ),
+    'tx_segwit_P2WSH.py': (
+        "01000000000101074affee5e2466e4a343a727557acabbce4ebd3d0a3b9a6f78a7055af91d89300000000000ffffffff01c0"
+        "12000000000000160014bfe9245401f8296878931281b14236e352bc44330400483045022100ed3bace23c5e17652e174c83"
+        "5fb72bf53ee306b3406a26890221b4cef7500f880220297f25c4ac91167ef8ab0837950c2fab62df7189b01215d3c71accac"
+        "6ae1fbe401483045022100ed3bace23c5e17652e174c835fb72bf53ee306b3406a26890221b4cef7500f8802203f27c57c56"
+        "6ddc74e314bb66bba064a729db1f3f28779507a6a077c168d47619014752210304b1f5be56c4337d1486140c9f622de1b70e"
+        "b6cc3a016fdd2d8e99b1ad12df852102d0675944a9b0bfa3f711e963dc6522e078595984db84ddb818b43dfe216bcef852ae"
+        "00000000"
+    ),
+    'tx_mixed_P2SH_P2WPKH.py': (
+        "010000000001017bfa5e1676de9389c6c9b1cda6f5d82b71afa59fd19ecf234edf438edb8cd8880000000017160014e6763f"
+        "1df03377d7cd86cfa1346a4d36b621ad7bffffffff0144411600000000001976a914bfe9245401f8296878931281b14236e3"
+        "52bc443388ac02483045022100ed3bace23c5e17652e174c835fb72bf53ee306b3406a26890221b4cef7500f8802203a0828"
+        "bc186b20bdf07df94f2f1d7d4f278b4e5e96eb652a8b9dd6ea0f48d49b01210304b1f5be56c4337d1486140c9f622de1b70e"
+        "b6cc3a016fdd2d8e99b1ad12df8500000000"
+    ),
+    'tx_mixed_P2SH_P2WSH.py': (
+        "0100000000010148ce19260272b09048fddc3da17663e558932a43e02be166f178d6e4de8d2d450100000023220020ec7a3b"
+        "a5fb84a649bb61e0dc6838f0ef53b46af744055c44b0fc8a7c34bb2922ffffffff017c150000000000001976a914bfe92454"
+        "01f8296878931281b14236e352bc443388ac0400483045022100ed3bace23c5e17652e174c835fb72bf53ee306b3406a2689"
+        "0221b4cef7500f880220536bd96d1825f7a20946b53f460a3e52f5b347dc5e158a7b1f14979eb1a145bf01483045022100ed"
+        "3bace23c5e17652e174c835fb72bf53ee306b3406a26890221b4cef7500f88022043ed3b51e4db156a1af9872269492d5938"
+        "41044178a96ae5330282804ade8985014752210304b1f5be56c4337d1486140c9f622de1b70eb6cc3a016fdd2d8e99b1ad12"
+        "df852102d0675944a9b0bfa3f711e963dc6522e078595984db84ddb818b43dfe216bcef852ae00000000"
+    ),
+    'tx_taproot_key_path.py': (
+        "0100000000010135aa1dbe3ee26ef1f21b8d2c58d3b1d10309acc1275eaa617ad9e61631ff972e0000000000ffffffff017c"
+        "1500000000000022512046ebfb52e520b74148391333e3dd29db90bf3c32f21f1b07bc2fc2d4ebee91990140ed3bace23c5e"
+        "17652e174c835fb72bf53ee306b3406a26890221b4cef7500f8817526f8999188c423ffe65ac47f871be2b6641ec0269fc7f"
+        "cf372bbd8b6d715500000000"
+    ),
+    'tx_taproot_tapscript_path.py': (
+        "01000000000101e959e8286c3d4550f3ed1e36ae89b1b8df795a7f874687be436f78f544a4da660000000000ffffffff01bc"
+        "3400000000000022512046ebfb52e520b74148391333e3dd29db90bf3c32f21f1b07bc2fc2d4ebee91990340ed3bace23c5e"
+        "17652e174c835fb72bf53ee306b3406a26890221b4cef7500f885e086daad3ea4499c4f3a4c56b611466abed1e2fd753d4f7"
+        "b101dd8d146994252220ad45225b019532a9161bd5d2c9e103190ebea0ce724471ef033a16ae75b8e420ac61c106caee74f2"
+        "3f4ce3a7e9421ffbbac2c54a9c58559b887371730f1184b3822e173bebcba51b760dfea48e3012c3da43638387b0c623ef57"
+        "7ceb5e96ea2a5e246e5d270ddc5accffc6865dc8e7904d68d6ba2c30a69aa8ffa47d5fd236f09c644e00000000"
+    ),
+}
+
+# (module, name) timed when a script imports it by name, with its stage
+TIMED_FUNCTIONS = {
+    (ECDSA, 'pubkey_from_privkey'): 'keys',
+    (ECDSA, 'multiply'): 'keys',
+    (ECDSA, 'add'): 'keys',
+    (Tools, 'sha256_2'): 'sighash',
+    (Tools, 'sha256'): 'sighash',
+    (Schnorr, 'tagged_hash'): 'sighash',
+    (ECDSA, 'sign'): 'signing',
+    (Schnorr, 'sign_schnorr'): 'signing',
+    (Schnorr, 'SchnorrKeypair'): 'keys',
+}
+
+STAGES = ('keys', 'sighash', 'signing', 'serialization')
+
+# label printed by the scripts -> the same field read from the parsed transaction (first input / output)
+BREAKDOWN_FIELDS = {
+    'version': lambda tx: Tools.INT32_LE.pack(tx.version),
+    'marker': lambda tx: tx.raw[4:5],
+    'flag': lambda tx: tx.raw[5:6],
+    'input count': lambda tx: Tools.compact_size_of(len(tx.inputs)),
+    'txid reversed': lambda tx: tx.inputs[0].txid_reversed,
+    'vout': lambda tx: Tools.UINT32_LE.pack(tx.inputs[0].vout),
+    'len unlocking script': lambda tx: Tools.compact_size(tx.inputs[0].unlocking_script),
+    'unlocking script': lambda tx: tx.inputs[0].unlocking_script,
+    'sequence': lambda tx: Tools.UINT32_LE.pack(tx.inputs[0].sequence),
+    'output count': lambda tx: Tools.compact_size_of(len(tx.outputs)),
+    'amount': lambda tx: Tools.UINT64_LE.pack(tx.outputs[0].amount),
+    'len locking script': lambda tx: Tools.compact_size(tx.outputs[0].locking_script),
+    'locking script': lambda tx: tx.outputs[0].locking_script,
+    'witness count': lambda tx: Tools.compact_size_of(len(tx.witnesses[0])),
+    'locktime': lambda tx: Tools.UINT32_LE.pack(tx.locktime),
+}
+
+
+class StageTimer:
+    """Accumulate the time spent in every stage, counting nested calls only in the outermost stage"""
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.active = False
+
+    def wrap(self, function, stage: str):
+        """Return a version of function whose calls are added to stage"""
+        def timed(*args, **kwargs):
+            if self.active:
+                return function(*args, **kwargs)
+            self.active = True
+            start = default_timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.seconds[stage] += default_timer() - start
+                self.active = False
+        return timed
+
+
+class TimedImport:
+    """Stands for a module in the "from module import ..." of a script, handing out timed versions of some names"""
+    __slots__ = ('module', 'timed')
+
+    def __init__(self, module, timed: dict):
+        self.module = module
+        self.timed = timed
+
+    def __getattr__(self, name):
+        if name in self.timed:
+            return self.timed[name]
+        return getattr(self.module, name)
+
+
+def script_builtins(timer: StageTimer) -> dict:
+    """Builtins for a script in which the names of TIMED_FUNCTIONS imported with "from module import ..." are timed.
+
+    Only the names bound in the script are timed: the modules themselves are left alone, so e.g. the sha256 used
+    by Tools.hash160 (addresses, key hashes) still counts as serialization."""
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        module = builtins.__import__(name, globals, locals, fromlist, level)
+        timed = {attr: timer.wrap(getattr(module, attr), stage)
+                 for (timed_module, attr), stage in TIMED_FUNCTIONS.items()
+                 if timed_module is module and attr in (fromlist or ())}
+        return TimedImport(module, timed) if timed else module
+
+    return dict(builtins.__dict__, __import__=timed_import)
+
+
+# compiled code of every script, so that reading and compiling the source isn't timed
+_compiled = {}
+
+
+def compiled(script: str):
+    """Return the code object of a tx script, compiling it the first time"""
+    if script not in _compiled:
+        path = os.path.join(ROOT, script)
+        with open(path, encoding='utf-8') as f:
+            _compiled[script] = compile(f.read(), path, 'exec')
+    return _compiled[script]
+
+
+def check_breakdown(output: str) -> [str]:
+    """Compare the fields printed by a script with the transaction (first line) parsed back: labels that differ"""
+    lines = output.split("\n")
+    tx = TransactionView(bytes.fromhex(lines[0]))
+    printed = {}
+    for line in lines[1:]:
+        label, _, value = line.partition(":")
+        # only the first field with a label (first input / output)
+        printed.setdefault(label.strip(), value.strip())
+    return [label for label, field in BREAKDOWN_FIELDS.items()
+            if label in printed and bytes(field(tx)).hex() != printed[label]]
+
+
+def check_object_model(raw: bytes) -> [str]:
+    """Round-trip a raw transaction through Tx and change it: the checks that failed"""
+    failed = []
+    parsed = Tx.parse(raw)
+    rebuilt = Tx(parsed.version,
+                 [TxIn(txin.txid, txin.vout, txin.unlocking_script, txin.sequence, Witness(txin.witness.items))
+                  for txin in parsed.inputs],
+                 [TxOut(txout.amount, txout.locking_script) for txout in parsed.outputs],
+                 parsed.locktime)
+    if parsed.serialize_witness() != raw:
+        failed.append("parse")
+    if rebuilt.serialize_witness() != raw:
+        failed.append("rebuild")
+    if (rebuilt.txid, rebuilt.wtxid) != (parsed.txid, parsed.wtxid) \
+            or parsed.wtxid != Tools.sha256_2(raw)[::-1]:
+        failed.append("ids")
+
+    # change an input of the parsed transaction: its cached values must be recomputed
+    txid, wtxid, sha_sequences = parsed.txid, parsed.wtxid, parsed.sha_sequences
+    txin = parsed.inputs[0]
+    txin.sequence ^= 1
+    if parsed.txid == txid or parsed.wtxid == wtxid or parsed.sha_sequences == sha_sequences:
+        failed.append("sequence change")
+    txin.sequence ^= 1
+    if (parsed.txid, parsed.wtxid, parsed.sha_sequences) != (txid, wtxid, sha_sequences):
+        failed.append("sequence restored")
+    # a new witness changes only the wtxid
+    items = txin.witness.items
+    txin.witness.items = items + (b'\x01',)
+    if parsed.wtxid == wtxid or parsed.txid != txid or parsed.sha_sequences != sha_sequences:
+        failed.append("witness change")
+    txin.witness.items = items
+    if parsed.serialize_witness() != raw or parsed.wtxid != wtxid:
+        failed.append("witness restored")
+    return failed
+
+
+def run_flow(script: str) -> (str, dict):
+    """Run a tx script in this process: return what it printed and the seconds per stage"""
+    # every run derives its keys from scratch
+    ECDSA.pubkey_cache_clear()
+    code = compiled(script)
+    timer = StageTimer()
+    output = io.StringIO()
+    namespace = {'__name__': '__main__', '__file__': code.co_filename, '__builtins__': script_builtins(timer)}
+    with redirect_stdout(output):
+        start = default_timer()
+        exec(code, namespace)
+        total = default_timer() - start
+    timer.seconds['serialization'] = total - sum(timer.seconds.values())
+    timer.seconds['total'] = total
+    return output.getvalue(), timer.seconds
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the tx_*.py flows and check their raw transactions")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help=f"runs of every flow (default {DEFAULT_ROUNDS})")
+    parser.add_argument('-o', '--output', help="write the median seconds per stage to this JSON file")
+    args = parser.parse_args(argv)
+
+    # the table of G is built once per process, not in the first flow
+    ECDSA.generator_table()
+    results = {}
+    failures = []
+    print(f"{'flow':<32}" + "".join(f"{stage:>15}" for stage in STAGES + ('total',)))
+    for script, expected in EXPECTED_TX_HEX.items():
+        runs = []
+        for _ in range(args.rounds):
+            output, seconds = run_flow(script)
+            if output.split("\n", 1)[0].strip() != expected:
+                failures.append(script)
+                break
+            runs.append(seconds)
+        if script in failures:
+            print(f"{script:<32} WRONG TRANSACTION")
+            continue
+        wrong_fields = check_breakdown(output) + check_object_model(bytes.fromhex(expected))
+        if wrong_fields:
+            failures.append(script)
+            print(f"{script:<32} WRONG FIELDS: {', '.join(wrong_fields)}")
+            continue
+        results[script] = {stage: statistics.median(run[stage] for run in runs) for stage in runs[0]}
+        print(f"{script:<32}" + "".join(f"{results[script][stage] * 1e3:12.3f} ms"
+                                        for stage in STAGES + ('total',)))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rounds': args.rounds, 'results': results}, f, indent=2)
+    if failures:
+        print(f"raw transaction changed: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
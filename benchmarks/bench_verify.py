@@ -0,0 +1,82 @@
+import os
+import secrets
+import sys
+from timeit import timeit
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ECDSA import n, multiply, sign_recoverable, recover_public_key, recover_public_keys, parse_public_key_uncached, parse_public_key, public_key_cache_info, multiply_jacobian, multiply_joint, jacobian_add, from_jacobian, sign, \
+    verify  # noqa: E402
+from Keys import ser_public_key_compressed  # noqa: E402
+from Schnorr import sign_schnorr, verify_schnorr  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: signature verification
+#
+# u1 * G + u2 * Q computed as two separate multiplications plus
+# one addition, against the joint (Strauss-Shamir) multiplication
+# that shares a single chain of doublings.
+#
+# Then the cost of decoding the same public key again and again,
+# with and without the cache of parse_public_key, and public key
+# recovery from 65-byte recoverable signatures, one by one or in bulk.
+#
+# -------------------------------------------------------------- #
+
+NUM_ROUNDS = 50
+
+
+def multiply_separate(u1, u2, point):
+    """Reference u1 * G + u2 * point with two independent multiplications"""
+    return from_jacobian(jacobian_add(multiply_jacobian(u1), multiply_jacobian(u2, point)))
+
+
+def bench(label, func, items):
+    """Time func over all the items and print the cost of a single call"""
+    it = iter(items)
+    seconds = timeit(lambda: func(*next(it)), number=len(items))
+    per_call = seconds / len(items) * 1e6
+    print(f"{label:<40} {per_call:10.1f} µs/op")
+    return per_call
+
+
+if __name__ == '__main__':
+    Q = multiply(secrets.randbelow(n - 1) + 1)
+    scalars = [(secrets.randbelow(n), secrets.randbelow(n), Q) for _ in range(NUM_ROUNDS)]
+    for u1, u2, point in scalars[:5]:
+        assert multiply_joint(u1, u2, point) == multiply_separate(u1, u2, point)
+
+    separate = bench("u1 * G + u2 * Q (separate)", multiply_separate, scalars)
+    joint = bench("u1 * G + u2 * Q (joint)", multiply_joint, scalars)
+    print(f"speedup: {separate / joint:.2f}x")
+
+    d = secrets.randbelow(n - 1) + 1
+    P = multiply(d)
+    x_only = P[0].to_bytes(32, byteorder="big")
+    ecdsa_items = []
+    schnorr_items = []
+    for _ in range(NUM_ROUNDS):
+        msg = secrets.token_bytes(32)
+        ecdsa_items.append((P, msg, sign(d, msg)))
+        schnorr_items.append((x_only, msg, sign_schnorr(d, msg)))
+    assert all(verify(*item) for item in ecdsa_items)
+    assert all(verify_schnorr(*item) for item in schnorr_items)
+    bench("verify", verify, ecdsa_items)
+    bench("verify_schnorr", verify_schnorr, schnorr_items)
+
+    compressed = ser_public_key_compressed(P)
+    keys = [(compressed,), (x_only,)] * NUM_ROUNDS
+    # ECDSA takes SEC keys only: the same point as an x-only key must not verify
+    assert verify(compressed, *ecdsa_items[0][1:]) and not verify(x_only, *ecdsa_items[0][1:])
+    bench("parse_public_key_uncached", parse_public_key_uncached, keys)
+    bench("parse_public_key (cached)", parse_public_key, keys)
+    bench("verify (serialized key, cached)", verify, [(compressed, msg, sig) for _, msg, sig in ecdsa_items])
+    print(public_key_cache_info())
+
+    recoverable = [(msg, sign_recoverable(d, msg)) for _, msg, _ in ecdsa_items]
+    assert recover_public_keys(recoverable) == [P] * len(recoverable)
+    bench("recover_public_key", recover_public_key, recoverable)
+    bulk = timeit(lambda: recover_public_keys(recoverable), number=1) / len(recoverable) * 1e6
+    print(f"{'recover_public_keys':<40} {bulk:10.1f} µs/op")
@@ -0,0 +1,51 @@
+import os
+import secrets
+import sys
+from time import perf_counter
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ECDSA import n, multiply, sign, verify, verify_batch  # noqa: E402
+
+# -------------------------------------------------------------- #
+#
+# Benchmark: throughput of verify_batch with 1, 2, 4, ... worker
+# processes (up to the number of cores), against the plain loop
+# over verify.
+#
+# -------------------------------------------------------------- #
+
+NUM_SIGNATURES = 512
+
+
+def make_items(num):
+    """Create num (public_key, msg, sig) triples, one of every 8 with a wrong message"""
+    items = []
+    for i in range(num):
+        d = secrets.randbelow(n - 1) + 1
+        msg = secrets.token_bytes(32)
+        sig = sign(d, msg)
+        if i % 8 == 7:
+            msg = secrets.token_bytes(32)
+        items.append((multiply(d), msg, sig))
+    return items
+
+
+def bench(label, func):
+    """Run func once and print the throughput in signatures per second"""
+    start = perf_counter()
+    results = func()
+    seconds = perf_counter() - start
+    print(f"{label:<40} {NUM_SIGNATURES / seconds:10.1f} sig/s")
+    return results
+
+
+if __name__ == '__main__':
+    items = make_items(NUM_SIGNATURES)
+    expected = bench("verify (loop)", lambda: [verify(*item) for item in items])
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        results = bench(f"verify_batch workers={workers}", lambda: verify_batch(items, workers=workers))
+        assert results == expected
+        workers *= 2
@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from timeit import default_timer
+
+# the course modules live in the root of the repository
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Backend  # noqa: E402
+from ECDSA import n, multiply, sign, verify  # noqa: E402
+from Schnorr import SchnorrKeypair, sign_schnorr, verify_schnorr, lift_x, tagged_hash  # noqa: E402
+from Script import create_redeem_script_multisig  # noqa: E402
+from Tools import hash160, sha256_2, compact_size, DER_encoding, TxWriter  # noqa: E402
+from Transaction import Tx, TxIn, TxOut, Witness  # noqa: E402
+
+try:
+    import Address
+except ImportError:
+    # base58 / bech32ref missing: the address cases are skipped
+    Address = None
+
+# -------------------------------------------------------------- #
+#
+# Micro-benchmark suite for the curve, hash and encoding primitives
+#
+#   python benchmarks/suite.py run [-o results.json] [-k REGEX]
+#   python benchmarks/suite.py compare baseline.json results.json
+#
+# Every case runs on inputs generated from a fixed seed. After a
+# warmup, the number of calls per round is calibrated so that a
+# round lasts at least MIN_ROUND_SECONDS, then ROUNDS rounds are
+# timed and the cost of a single call is reported (median, min,
+# mean, stdev). "compare" flags the cases whose median got slower
+# than the baseline by more than the threshold, and exits with 1.
+#
+# -------------------------------------------------------------- #
+
+SEED = 2009
+NUM_INPUTS = 64
+WARMUP_SECONDS = 0.2
+MIN_ROUND_SECONDS = 0.05
+ROUNDS = 7
+REGRESSION_THRESHOLD = 0.10
+RESULTS_VERSION = 1
+
+
+def build_cases():
+    """Return {name: (function, inputs)}: function is called as function(*input), cycling over the inputs"""
+    rng = random.Random(SEED)
+
+    def scalar():
+        return rng.randrange(1, n)
+
+    private_key = scalar()
+    public_key = multiply(private_key)
+    keypair = SchnorrKeypair(private_key)
+    msgs = [rng.randbytes(32) for _ in range(NUM_INPUTS)]
+    ecdsa_sigs = [sign(private_key, msg, scalar()) for msg in msgs]
+    schnorr_sigs = [sign_schnorr(keypair, msg, scalar()) for msg in msgs]
+    script = create_redeem_script_multisig([multiply(scalar()).compressed for _ in range(3)], 2, 3)
+    tx_inputs = [(rng.randbytes(32), rng.randrange(4), rng.randbytes(107)) for _ in range(100)]
+
+    def serialize_tx():
+        """A version 2 transaction with 100 inputs and one output"""
+        writer = TxWriter().write_int32(2).write_compact_size(len(tx_inputs))
+        for txid, vout, unlocking_script in tx_inputs:
+            writer.write_reversed(txid).write_uint32(vout).write_var_bytes(unlocking_script).write_uint32(0xffffffff)
+        writer.write_compact_size(1).write_uint64(10000).write_var_bytes(script).write_uint32(0)
+        return writer.getvalue()
+
+    def tx_ids_and_fee_data():
+        """The same transaction as a Tx with witnesses: ids, sizes and signature hashes (each serialized once)"""
+        tx = Tx(2, [TxIn(txid, vout, sequence=0xfffffffd, witness=Witness([unlocking_script[:72], script]))
+                    for txid, vout, unlocking_script in tx_inputs], [TxOut(10000, script)])
+        return tx.txid, tx.wtxid, tx.size, tx.vsize, tx.weight, tx.hash_prevouts, tx.hash_sequence, tx.hash_outputs
+
+    cases = {
+        'multiply_fixed_base': (multiply, [(scalar(),) for _ in range(NUM_INPUTS)]),
+        'multiply_variable_base': (multiply, [(scalar(), public_key) for _ in range(NUM_INPUTS)]),
+        'sign': (sign, [(private_key, msg, scalar()) for msg in msgs]),
+        'verify': (verify, [(public_key.compressed, msg, sig) for msg, sig in zip(msgs, ecdsa_sigs)]),
+        'sign_schnorr': (sign_schnorr, [(private_key, msg, scalar()) for msg in msgs]),
+        'verify_schnorr': (verify_schnorr, [(keypair.public_key_x_only, msg, sig)
+                                            for msg, sig in zip(msgs, schnorr_sigs)]),
+        'lift_x': (lift_x, [(multiply(scalar()).x,) for _ in range(NUM_INPUTS)]),
+        'tagged_hash': (tagged_hash, [("BIP0340/challenge", sig + keypair.public_key_x_only + msg)
+                                      for msg, sig in zip(msgs, schnorr_sigs)]),
+        'hash160': (hash160, [(public_key.compressed,)]),
+        'sha256_2': (sha256_2, [(rng.randbytes(250),) for _ in range(NUM_INPUTS)]),
+        'compact_size': (compact_size, [(b'\x00' * size,) for size in (20, 33, 71, 253, 520, 70000)]),
+        'DER_encoding': (DER_encoding, [(sig,) for sig in ecdsa_sigs]),
+        'TxWriter_100_inputs': (serialize_tx, [()]),
+        'Tx_ids_and_sizes_100_inputs': (tx_ids_and_fee_data, [()]),
+    }
+    if Address is not None:
+        witprog = keypair.public_key_x_only
+        cases.update({
+            'generate_address_P2PKH': (Address.generate_address_P2PKH, [(public_key.compressed,)]),
+            'generate_address_P2SH': (Address.generate_address_P2SH, [(script,)]),
+            'generate_address_P2WPKH': (Address.generate_address_P2WPKH, [(public_key.compressed,)]),
+            'generate_address_P2WSH': (Address.generate_address_P2WSH, [(script,)]),
+            'generate_address_P2TR': (Address.generate_address_P2TR, [(witprog,)]),
+        })
+    return cases
+
+
+def time_calls(function, inputs, number: int) -> float:
+    """Call function number times (cycling over the inputs) and return the elapsed seconds"""
+    calls = (inputs * (number // len(inputs) + 1))[:number]
+    start = default_timer()
+    for args in calls:
+        function(*args)
+    return default_timer() - start
+
+
+def measure(function, inputs, rounds=ROUNDS) -> dict:
+    """Warm up, calibrate the calls per round and time the rounds: statistics of a single call in seconds"""
+    deadline = default_timer() + WARMUP_SECONDS
+    while default_timer() < deadline:
+        time_calls(function, inputs, len(inputs))
+    number = 1
+    while time_calls(function, inputs, number) < MIN_ROUND_SECONDS:
+        number *= 2
+    per_call = [time_calls(function, inputs, number) / number for _ in range(rounds)]
+    return {
+        'median': statistics.median(per_call),
+        'min': min(per_call),
+        'mean': statistics.fmean(per_call),
+        'stdev': statistics.stdev(per_call) if rounds > 1 else 0.0,
+        'calls_per_round': number,
+        'rounds': rounds,
+    }
+
+
+def run(pattern=None, rounds=ROUNDS) -> dict:
+    """Run the cases whose name matches pattern (all if None) and return the results document"""
+    results = {}
+    for name, (function, inputs) in build_cases().items():
+        if pattern and not re.search(pattern, name):
+            continue
+        results[name] = measure(function, inputs, rounds)
+        print(f"{name:<28} {results[name]['median'] * 1e6:12.2f} µs/op "
+              f"(min {results[name]['min'] * 1e6:.2f}, ±{results[name]['stdev'] * 1e6:.2f})", file=sys.stderr)
+    return {
+        'version': RESULTS_VERSION,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'backend': Backend.BACKEND,
+        'seed': SEED,
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold=REGRESSION_THRESHOLD) -> [str]:
+    """Print the median of every case in both documents and return the names of the regressions"""
+    regressions = []
+    print(f"{'case':<28} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, entry in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<28} {'-':>12} {entry['median'] * 1e6:10.2f}µs {'new':>9}")
+            continue
+        change = entry['median'] / base['median'] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<28} {base['median'] * 1e6:10.2f}µs {entry['median'] * 1e6:10.2f}µs {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the curve, hash and encoding primitives")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('-o', '--output', help="write the results to this JSON file (default: stdout)")
+    run_parser.add_argument('-k', '--filter', help="run only the cases matching this regular expression")
+    run_parser.add_argument('--rounds', type=int, default=ROUNDS, help=f"timed rounds per case (default {ROUNDS})")
+    compare_parser = commands.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                                help=f"relative slowdown flagged as a regression (default {REGRESSION_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        document = run(args.filter, args.rounds)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(document, f, indent=2)
+        else:
+            print(json.dumps(document, indent=2))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
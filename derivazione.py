@@ -2,8 +2,8 @@ from base58 import b58encode_check
 from Tools import bytes_from_int, hash160, int_from_bytes
 from hashlib import sha512, pbkdf2_hmac
 import hmac
-from ECDSA import multiply
-from Keys import ser_public_key_compressed
+from ECDSA import multiply, multiply_jacobian, pubkey_from_privkey
+from Keys import ser_public_key_compressed, ser_public_keys_ECDSA
 
 
 # -------------------------------------------------------------------------------------------------------- #
@@ -106,7 +106,7 @@ def CKDpriv(xpriv: (int, bytes), index: int) -> (int, bytes):
     if index >= 2 ** 31:
         h = hmac.new(c_par, b'\x00' + bytes_from_int(k_par, NUM_BYTE_32) + bytes_from_int(index, NUM_BYTE_4), sha512).digest()
     else:
-        h = hmac.new(c_par, ser_public_key_compressed(multiply(k_par)) + bytes_from_int(index, 4), sha512).digest()
+        h = hmac.new(c_par, ser_public_key_compressed(pubkey_from_privkey(k_par)) + bytes_from_int(index, 4), sha512).digest()
     hL = h[0:32]
     hR = h[32:]
     k_i = (int_from_bytes(hL) + k_par) % n
@@ -117,6 +117,13 @@ def CKDpriv(xpriv: (int, bytes), index: int) -> (int, bytes):
     return xpriv_child
 
 
+def derive_child_pub_keys(xpriv: (int, bytes), indexes: [int]) -> [bytes]:
+    """Generate the serialized public keys of many children of an extended private key (e.g. for a gap limit scan)"""
+    child_priv_keys = [CKDpriv(xpriv, index)[0] for index in indexes]
+    # the public keys stay in Jacobian coordinates and get normalized all together
+    return ser_public_keys_ECDSA([multiply_jacobian(k_i) for k_i in child_priv_keys])
+
+
 def CKDpub(xpub: (bytes, bytes), index: int) -> (bytes, bytes):
     """Generate a child extended public key from the parent extended public key (not serialized).
 
@@ -141,7 +148,7 @@ if __name__ == '__main__':
     seed_hex = "000102030405060708090a0b0c0d0e0f"
 
     k_master, c_master = master_key_generation(bytes.fromhex(seed_hex))
-    K_master = ser_public_key_compressed(multiply(k_master))
+    K_master = ser_public_key_compressed(pubkey_from_privkey(k_master))
 
     xpriv_m = ser_extended_priv_keys(k_master, c_master, 0, master_key='True')
     xpub_m = ser_extended_pub_keys(K_master, c_master, 0, 0, master_key='True')
@@ -150,7 +157,7 @@ if __name__ == '__main__':
 
     xpriv_m_0h_1_2h = CKDpriv(CKDpriv(CKDpriv((k_master, c_master), 2 ** 31), 1), 2 ** 31 + 2)
     k_m_0h_1_2h, c_m_0h_1_2h = xpriv_m_0h_1_2h
-    K_m_0h_1_2h = ser_public_key_compressed(multiply(k_m_0h_1_2h))
+    K_m_0h_1_2h = ser_public_key_compressed(pubkey_from_privkey(k_m_0h_1_2h))
 
     k_m_0h_1_2h_2, c_m_0h_1_2h_2 = CKDpriv(xpriv_m_0h_1_2h, 2)
 
@@ -1,7 +1,7 @@
-from ECDSA import multiply, sign
+from ECDSA import pubkey_from_privkey, sign
 from Keys import ser_public_key_compressed
 from Address import generate_address_P2PKH_testnet
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding, TxWriter
 from Script import create_locking_script_P2PKH
 
 # -------------------------------------------------------------- #
@@ -51,7 +51,7 @@ NUM_BYTES_8 = 8
 # Seleziono una chiave privata k, numero intero fra 0 e n-1, dove n è l'ordine della curva ellittica
 k = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K = multiply(k)
+K = pubkey_from_privkey(k)
 # La serializzo nella sua forma compressa
 K_ser = ser_public_key_compressed(K)
 # Genero l'address di ricezione P2PKH collegato a questa coppia di chiavi crittografiche
@@ -126,8 +126,10 @@ len_locking_script_dest = compact_size(locking_script_dest)
 # circolare, coincide con il locking script di questa stessa transazione
 #
 # ------------------------------------------------------------------------------ #
-tx_to_be_signed = version + input_count + txid_reverse + vout + len_locking_script_input + locking_script_input + sequence \
-                  + output_count + amount + len_locking_script_dest + locking_script_dest + locktime + sig_hash
+tx_to_be_signed = TxWriter()\
+    .write(version, input_count, txid_reverse, vout, len_locking_script_input, locking_script_input, sequence)\
+    .write(output_count, amount, len_locking_script_dest, locking_script_dest, locktime, sig_hash)\
+    .getvalue()
 
 # Faccio l'hash del messaggio
 tx_hash = sha256_2(tx_to_be_signed)
@@ -140,7 +142,7 @@ signature_der_encoded = DER_encoding(signature)
 signature_der_encoded = signature_der_encoded + sig_hash_type
 
 # A questo punto posso creare il corretto unlocking script per la transazione
-unlocking_script = compact_size(signature_der_encoded) + signature_der_encoded + compact_size(K_ser) + K_ser
+unlocking_script = TxWriter().write_var_bytes(signature_der_encoded, K_ser).getvalue()
 len_unlocking_script = compact_size(unlocking_script)
 
 
@@ -150,8 +152,10 @@ len_unlocking_script = compact_size(unlocking_script)
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + input_count + txid_reverse + vout + len_unlocking_script + unlocking_script + sequence \
-            + output_count + amount + len_locking_script_dest + locking_script_dest + locktime
+tx_signed = TxWriter()\
+    .write(version, input_count, txid_reverse, vout, len_unlocking_script, unlocking_script, sequence)\
+    .write(output_count, amount, len_locking_script_dest, locking_script_dest, locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
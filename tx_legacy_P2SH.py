@@ -1,7 +1,7 @@
-from ECDSA import multiply, sign
+from ECDSA import pubkey_from_privkey, sign
 from Keys import ser_public_key_compressed
 from Address import generate_address_P2SH_testnet, generate_address_P2PKH_testnet
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding, TxWriter
 from Script import create_redeem_script_multisig, create_locking_script_P2PKH
 
 # -------------------------------------------------------------- #
@@ -55,14 +55,14 @@ OP_0 = b'\x00'
 # Seleziono una chiave privata k1
 k1 = 75282383716026770851796771414193474962426130999119568701422782830663027711070
 # Genero la chiave pubblica corrispondente
-K1 = multiply(k1)
+K1 = pubkey_from_privkey(k1)
 # La serializzo nella sua forma compressa
 K1_ser = ser_public_key_compressed(K1)
 
 # Seleziono una chiave privata k2
 k2 = 75282383716026770851796771414193474962426130999119568701422782830663027711082
 # Genero la chiave pubblica corrispondente
-K2 = multiply(k2)
+K2 = pubkey_from_privkey(k2)
 # La serializzo nella sua forma compressa
 K2_ser = ser_public_key_compressed(K2)
 
@@ -75,7 +75,7 @@ address = generate_address_P2SH_testnet(redeem_script) # 2MxQ2b48ceW3wanqx4WpVPm
 # Seleziono una chiave privata k_dest, per la ricezione dei fondi
 k_dest = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K_dest = multiply(k_dest)
+K_dest = pubkey_from_privkey(k_dest)
 # La serializzo nella sua forma compressa
 K_dest_ser = ser_public_key_compressed(K_dest)
 # Genero l'address di ricezione P2PKH collegato a questa coppia di chiavi crittografiche
@@ -151,8 +151,11 @@ len_locking_script_P2PKH = compact_size(locking_script_P2PKH)
 # relativo alla tx referenziata nell'input, ma, appunto, il redeem script
 #
 # ------------------------------------------------------------------------------ #
-tx_to_be_signed = version + input_count + txid_reverse + vout + compact_size(redeem_script) + redeem_script + sequence\
-                  + output_count + amount + len_locking_script_P2PKH + locking_script_P2PKH + locktime + sig_hash
+tx_to_be_signed = TxWriter()\
+    .write(version, input_count, txid_reverse, vout)\
+    .write_var_bytes(redeem_script)\
+    .write(sequence, output_count, amount, len_locking_script_P2PKH, locking_script_P2PKH, locktime, sig_hash)\
+    .getvalue()
 
 # Faccio l'hash del messaggio
 tx_hash = sha256_2(tx_to_be_signed)
@@ -172,9 +175,10 @@ signature2_der_encoded = DER_encoding(signature2)
 signature2_der_encoded = signature2_der_encoded + sig_hash_type
 
 # A questo punto posso creare il corretto unlocking script per la transazione
-unlocking_script = OP_0 + compact_size(signature1_der_encoded) + signature1_der_encoded\
-                   + compact_size(signature2_der_encoded) + signature2_der_encoded\
-                   + compact_size(redeem_script) + redeem_script
+unlocking_script = TxWriter()\
+    .write(OP_0)\
+    .write_var_bytes(signature1_der_encoded, signature2_der_encoded, redeem_script)\
+    .getvalue()
 len_unlocking_script = compact_size(unlocking_script)
 
 # ------------------------------------------------------------------------------ #
@@ -183,8 +187,10 @@ len_unlocking_script = compact_size(unlocking_script)
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + input_count + txid_reverse + vout + len_unlocking_script + unlocking_script + sequence\
-            + output_count + amount + len_locking_script_P2PKH + locking_script_P2PKH + locktime
+tx_signed = TxWriter()\
+    .write(version, input_count, txid_reverse, vout, len_unlocking_script, unlocking_script, sequence)\
+    .write(output_count, amount, len_locking_script_P2PKH, locking_script_P2PKH, locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
@@ -1,7 +1,7 @@
-from ECDSA import multiply, sign
+from ECDSA import pubkey_from_privkey, sign
 from Keys import ser_public_key_compressed
 from Address import generate_address_P2SH_testnet, generate_address_P2PKH_testnet
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding, TxWriter
 from Script import create_locking_script_P2WPKH, create_locking_script_P2PKH
 
 # -------------------------------------------------------------- #
@@ -56,7 +56,7 @@ OP_0 = b'\x00'
 # Seleziono una chiave privata k
 k = 75282383716026770851796771414193474962426130999119568701422782830663027711070
 # Genero la chiave pubblica corrispondente
-K = multiply(k)
+K = pubkey_from_privkey(k)
 # La serializzo nella sua forma compressa
 K_ser = ser_public_key_compressed(K)
 
@@ -69,7 +69,7 @@ address = generate_address_P2SH_testnet(redeem_script) # 2N9ZS37RtC1oH3VqVCPm4Dh
 # Seleziono una chiave privata k_dest, per la ricezione dei fondi
 k_dest = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K_dest = multiply(k_dest)
+K_dest = pubkey_from_privkey(k_dest)
 # La serializzo nella sua forma compressa
 K_dest_ser = ser_public_key_compressed(K_dest)
 # Genero l'address di ricezione P2PKH collegato a questa coppia di chiavi crittografiche
@@ -168,8 +168,10 @@ hashOutputs = sha256_2(amount_to_send + len_locking_script_P2PKH + locking_scrip
 # outpoint = txid_reverse + vout of the input I am signing
 outpoint = txid_reverse + vout
 
-tx_to_be_signed = version + hashPrevouts + hashSequence + outpoint + scriptCode + amount_received\
-                  + sequence + hashOutputs + locktime + sig_hash
+tx_to_be_signed = TxWriter()\
+    .write(version, hashPrevouts, hashSequence, outpoint, scriptCode, amount_received, sequence, hashOutputs)\
+    .write(locktime, sig_hash)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -188,7 +190,7 @@ signature_der_encoded = DER_encoding(signature)
 signature_der_encoded = signature_der_encoded + sig_hash_type
 
 # A questo punto posso creare il corretto unlocking script per la transazione
-unlocking_script = compact_size(redeem_script) + redeem_script
+unlocking_script = TxWriter().write_var_bytes(redeem_script).getvalue()
 len_unlocking_script = compact_size(unlocking_script)
 
 # ------------------------------------------------------------------------------ #
@@ -212,8 +214,7 @@ len_unlocking_script = compact_size(unlocking_script)
 
 witness_count = b'\x02'  # signature_der_encoded and public_key
 
-witness = witness_count + compact_size(signature_der_encoded) + signature_der_encoded\
-          + compact_size(K_ser) + K_ser
+witness = TxWriter().write(witness_count).write_var_bytes(signature_der_encoded, K_ser).getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -221,9 +222,11 @@ witness = witness_count + compact_size(signature_der_encoded) + signature_der_en
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + marker + flag + input_count + txid_reverse + vout + len_unlocking_script + unlocking_script\
-            + sequence + output_count + amount_to_send + len_locking_script_P2PKH + locking_script_P2PKH\
-            + witness + locktime
+tx_signed = TxWriter()\
+    .write(version, marker, flag, input_count, txid_reverse, vout, len_unlocking_script, unlocking_script)\
+    .write(sequence, output_count, amount_to_send, len_locking_script_P2PKH, locking_script_P2PKH, witness)\
+    .write(locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
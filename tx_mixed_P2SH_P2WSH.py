@@ -1,7 +1,7 @@
-from ECDSA import multiply, sign
+from ECDSA import pubkey_from_privkey, sign
 from Keys import ser_public_key_compressed
 from Address import generate_address_P2PKH_testnet, generate_address_P2SH_testnet
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding, TxWriter
 from Script import create_redeem_script_multisig, create_locking_script_P2PKH, create_locking_script_P2WSH
 
 # -------------------------------------------------------------- #
@@ -58,14 +58,14 @@ OP_0 = b'\x00'
 # Seleziono una chiave privata k1
 k1 = 75282383716026770851796771414193474962426130999119568701422782830663027711070
 # Genero la chiave pubblica corrispondente
-K1 = multiply(k1)
+K1 = pubkey_from_privkey(k1)
 # La serializzo nella sua forma compressa
 K1_ser = ser_public_key_compressed(K1)
 
 # Seleziono una chiave privata k2
 k2 = 75282383716026770851796771414193474962426130999119568701422782830663027711082
 # Genero la chiave pubblica corrispondente
-K2 = multiply(k2)
+K2 = pubkey_from_privkey(k2)
 # La serializzo nella sua forma compressa
 K2_ser = ser_public_key_compressed(K2)
 
@@ -81,7 +81,7 @@ address = generate_address_P2SH_testnet(redeem_script) # 2MzFcC5atqiVFcdEsFKmfY2
 # Seleziono una chiave privata k_dest, per la ricezione dei fondi
 k_dest = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K_dest = multiply(k_dest)
+K_dest = pubkey_from_privkey(k_dest)
 # La serializzo nella sua forma compressa
 K_dest_ser = ser_public_key_compressed(K_dest)
 # Genero l'address di ricezione P2PKH collegato a questa coppia di chiavi crittografiche
@@ -180,8 +180,10 @@ hashOutputs = sha256_2(amount_to_send + len_locking_script_P2PKH + locking_scrip
 # outpoint = txid_reverse + vout of the input I am signing
 outpoint = txid_reverse + vout
 
-tx_to_be_signed = version + hashPrevouts + hashSequence + outpoint + scriptCode + amount_received\
-                  + sequence + hashOutputs + locktime + sig_hash
+tx_to_be_signed = TxWriter()\
+    .write(version, hashPrevouts, hashSequence, outpoint, scriptCode, amount_received, sequence, hashOutputs)\
+    .write(locktime, sig_hash)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -207,7 +209,7 @@ signature2_der_encoded = DER_encoding(signature2)
 signature2_der_encoded = signature2_der_encoded + sig_hash_type
 
 # A questo punto posso creare il corretto unlocking script per la transazione
-unlocking_script = compact_size(redeem_script) + redeem_script
+unlocking_script = TxWriter().write_var_bytes(redeem_script).getvalue()
 len_unlocking_script = compact_size(unlocking_script)
 
 # ------------------------------------------------------------------------------ #
@@ -233,10 +235,10 @@ len_unlocking_script = compact_size(unlocking_script)
 
 witness_count = b'\x04'
 
-witness = witness_count + OP_0\
-          + compact_size(signature1_der_encoded) + signature1_der_encoded\
-          + compact_size(signature2_der_encoded) + signature2_der_encoded\
-          + compact_size(witness_script) + witness_script
+witness = TxWriter()\
+    .write(witness_count, OP_0)\
+    .write_var_bytes(signature1_der_encoded, signature2_der_encoded, witness_script)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -244,9 +246,11 @@ witness = witness_count + OP_0\
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + marker + flag + input_count + txid_reverse + vout + len_unlocking_script + unlocking_script\
-            + sequence + output_count + amount_to_send + len_locking_script_P2PKH + locking_script_P2PKH\
-            + witness + locktime
+tx_signed = TxWriter()\
+    .write(version, marker, flag, input_count, txid_reverse, vout, len_unlocking_script, unlocking_script)\
+    .write(sequence, output_count, amount_to_send, len_locking_script_P2PKH, locking_script_P2PKH, witness)\
+    .write(locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
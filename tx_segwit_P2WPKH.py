@@ -1,7 +1,7 @@
-from ECDSA import multiply, sign
+from ECDSA import pubkey_from_privkey, sign
 from Keys import ser_public_key_compressed
 from Address import generate_address_P2WPKH_testnet
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding, TxWriter
 from Script import create_locking_script_P2WPKH
 
 # -------------------------------------------------------------- #
@@ -53,7 +53,7 @@ NUM_BYTES_8 = 8
 # Seleziono una chiave privata k, numero intero fra 0 e n-1, dove n è l'ordine della curva ellittica
 k = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K = multiply(k)
+K = pubkey_from_privkey(k)
 # La serializzo nella sua forma compressa
 K_ser = ser_public_key_compressed(K)
 # Genero l'address di ricezione P2WPKH collegato a questa coppia di chiavi crittografiche
@@ -149,8 +149,10 @@ hashOutputs = sha256_2(amount_to_send + len_locking_script_dest + locking_script
 # outpoint = txid_reverse + vout of the input I am signing
 outpoint = txid_reverse + vout
 
-tx_to_be_signed = version + hashPrevouts + hashSequence + outpoint + scriptCode + amount_received\
-                  + sequence + hashOutputs + locktime + sig_hash
+tx_to_be_signed = TxWriter()\
+    .write(version, hashPrevouts, hashSequence, outpoint, scriptCode, amount_received, sequence, hashOutputs)\
+    .write(locktime, sig_hash)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -189,8 +191,7 @@ signature_der_encoded = signature_der_encoded + sig_hash_type
 
 witness_count = b'\x02'  # signature_der_encoded and public_key
 
-witness = witness_count + compact_size(signature_der_encoded) + signature_der_encoded\
-          + compact_size(K_ser) + K_ser
+witness = TxWriter().write(witness_count).write_var_bytes(signature_der_encoded, K_ser).getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -198,8 +199,10 @@ witness = witness_count + compact_size(signature_der_encoded) + signature_der_en
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + marker + flag + input_count + txid_reverse + vout + b'\x00' + sequence \
-            + output_count + amount_to_send + len_locking_script_dest + locking_script_dest + witness + locktime
+tx_signed = TxWriter()\
+    .write(version, marker, flag, input_count, txid_reverse, vout, b'\x00', sequence, output_count, amount_to_send)\
+    .write(len_locking_script_dest, locking_script_dest, witness, locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
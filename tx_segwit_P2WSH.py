@@ -1,7 +1,7 @@
-from ECDSA import multiply, sign
+from ECDSA import pubkey_from_privkey, sign
 from Keys import ser_public_key_compressed
 from Address import generate_address_P2WSH_testnet, generate_address_P2WPKH_testnet
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256_2, DER_encoding, TxWriter
 from Script import create_redeem_script_multisig, create_locking_script_P2WPKH
 
 # -------------------------------------------------------------- #
@@ -58,14 +58,14 @@ OP_0 = b'\x00'
 # Seleziono una chiave privata k1
 k1 = 75282383716026770851796771414193474962426130999119568701422782830663027711070
 # Genero la chiave pubblica corrispondente
-K1 = multiply(k1)
+K1 = pubkey_from_privkey(k1)
 # La serializzo nella sua forma compressa
 K1_ser = ser_public_key_compressed(K1)
 
 # Seleziono una chiave privata k2
 k2 = 75282383716026770851796771414193474962426130999119568701422782830663027711082
 # Genero la chiave pubblica corrispondente
-K2 = multiply(k2)
+K2 = pubkey_from_privkey(k2)
 # La serializzo nella sua forma compressa
 K2_ser = ser_public_key_compressed(K2)
 
@@ -78,7 +78,7 @@ address = generate_address_P2WSH_testnet(redeem_script) # tb1qa3arhf0msjnynwmpur
 # Seleziono una chiave privata k_dest, per la ricezione dei fondi
 k_dest = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K_dest = multiply(k_dest)
+K_dest = pubkey_from_privkey(k_dest)
 # La serializzo nella sua forma compressa
 K_dest_ser = ser_public_key_compressed(K_dest)
 # Genero l'address di ricezione P2PKH collegato a questa coppia di chiavi crittografiche
@@ -177,8 +177,10 @@ hashOutputs = sha256_2(amount_to_send + len_locking_script_P2WPKH + locking_scri
 # outpoint = txid_reverse + vout of the input I am signing
 outpoint = txid_reverse + vout
 
-tx_to_be_signed = version + hashPrevouts + hashSequence + outpoint + scriptCode + amount_received\
-                  + sequence + hashOutputs + locktime + sig_hash
+tx_to_be_signed = TxWriter()\
+    .write(version, hashPrevouts, hashSequence, outpoint, scriptCode, amount_received, sequence, hashOutputs)\
+    .write(locktime, sig_hash)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -226,10 +228,10 @@ signature2_der_encoded = signature2_der_encoded + sig_hash_type
 
 witness_count = b'\x04'  #
 
-witness = witness_count + OP_0\
-          + compact_size(signature1_der_encoded) + signature1_der_encoded\
-          + compact_size(signature2_der_encoded) + signature2_der_encoded\
-          + compact_size(redeem_script) + redeem_script
+witness = TxWriter()\
+    .write(witness_count, OP_0)\
+    .write_var_bytes(signature1_der_encoded, signature2_der_encoded, redeem_script)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -237,8 +239,10 @@ witness = witness_count + OP_0\
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + marker + flag + input_count + txid_reverse + vout + b'\x00' + sequence\
-    + output_count + amount_to_send + len_locking_script_P2WPKH + locking_script_P2WPKH + witness + locktime
+tx_signed = TxWriter()\
+    .write(version, marker, flag, input_count, txid_reverse, vout, b'\x00', sequence, output_count, amount_to_send)\
+    .write(len_locking_script_P2WPKH, locking_script_P2WPKH, witness, locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
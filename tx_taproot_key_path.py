@@ -1,8 +1,6 @@
-from ECDSA import multiply
-from Keys import ser_public_key_schnorr
 from Address import generate_address_P2TR_testnet
-from Schnorr import tagged_hash, sign_schnorr
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256
+from Schnorr import tagged_hash, sign_schnorr, SchnorrKeypair
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256, TxWriter
 from Script import create_locking_script_P2TR, create_locking_script_P2PKH
 
 # -------------------------------------------------------------- #
@@ -53,10 +51,11 @@ NUM_BYTES_8 = 8
 
 # Seleziono una chiave privata k, numero intero fra 0 e n-1, dove n è l'ordine della curva ellittica
 k = 75282383716026770851796771414193474962426130999119568701422782830663027711072
-# Genero la chiave pubblica corrispondente
-K = multiply(k)
+# Genero la chiave pubblica corrispondente (una sola volta, insieme alla sua forma x-only)
+keypair = SchnorrKeypair(k)
+K = keypair.public_key
 # La serializzo nella sua forma compressa
-K_ser = ser_public_key_schnorr(K)
+K_ser = keypair.public_key_x_only
 # Genero l'address di ricezione P2TR collegato a questa coppia di chiavi crittografiche
 address = generate_address_P2TR_testnet(K_ser)  # tb1pgm4lk5h9yzm5zjpezve78hffmwgt70pj7g03kpau9lpdf6lwjxvs64wgl2
 
@@ -161,8 +160,11 @@ spend_type = bytes.fromhex("00") # key path -> ext_flag = 0
 # input_index (4) [∞]: index of this input in the transaction input vector. Index of the first input is 0
 input_index = bytes_from_int_reversed(0, NUM_BYTES_4)
 
-tx_to_be_signed = b'\x00' + hash_type + version + locktime + sha_prevouts + sha_amounts + sha_scriptpubkeys + sha_sequences\
-    + sha_outputs + spend_type + input_index  # first element is b'\x00' which is epoch 0
+# first element is b'\x00' which is epoch 0
+tx_to_be_signed = TxWriter()\
+    .write(b'\x00', hash_type, version, locktime, sha_prevouts, sha_amounts, sha_scriptpubkeys, sha_sequences)\
+    .write(sha_outputs, spend_type, input_index)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -174,7 +176,7 @@ tx_to_be_signed = b'\x00' + hash_type + version + locktime + sha_prevouts + sha_
 tx_hash = tagged_hash("TapSighash", tx_to_be_signed)
 
 # Firmo il messaggio con la chiave privata k, impostando un valore fisso del nonce pari a 100
-signature = sign_schnorr(private_key=k, msg=tx_hash, k=100)
+signature = sign_schnorr(private_key=keypair, msg=tx_hash, k=100)
 
 # Schnorr non utilizza l'encoding DER della firma
 # Visto che ho usato SIGHASH_ALL, non devo aggiungere alcun byte extra alla firma
@@ -199,7 +201,7 @@ signature = sign_schnorr(private_key=k, msg=tx_hash, k=100)
 
 witness_count = b'\x01'  # signature_der_encoded and public_key
 
-witness = witness_count + compact_size(signature) + signature
+witness = TxWriter().write(witness_count).write_var_bytes(signature).getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -207,8 +209,10 @@ witness = witness_count + compact_size(signature) + signature
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + marker + flag + input_count + txid_reverse + vout + b'\x00' + sequence\
-    + output_count + amount_to_send + len_locking_script_dest + locking_script_dest + witness + locktime
+tx_signed = TxWriter()\
+    .write(version, marker, flag, input_count, txid_reverse, vout, b'\x00', sequence, output_count, amount_to_send)\
+    .write(len_locking_script_dest, locking_script_dest, witness, locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 
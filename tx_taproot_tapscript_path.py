@@ -1,8 +1,8 @@
-from ECDSA import multiply, add
+from ECDSA import multiply, pubkey_from_privkey, add
 from Keys import ser_public_key_schnorr
 from Address import generate_address_P2TR_testnet
-from Schnorr import tagged_hash, sign_schnorr
-from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256, int_from_bytes
+from Schnorr import tagged_hash, sign_schnorr, SchnorrKeypair
+from Tools import compact_size, reverse_byte_order, bytes_from_int_reversed, bytes_from_int, sha256, int_from_bytes, TxWriter
 from Script import create_locking_script_P2TR
 
 # -------------------------------------------------------------- #
@@ -77,40 +77,37 @@ n = 1157920892373161954235709850086879078528375642790749043826051631415181614943
 # -------------------------------------------------------------- #
 
 # internal private and public key
+# SchnorrKeypair nega la chiave privata se la chiave pubblica ha y dispari (BIP-340)
 d = 18968816317819169306095104891728354025797295648084455976845396390496379316944
-P = multiply(d)
-if P[1] % 2 != 0:
-    d = n - d
-    P = multiply(d)
-P_ser = ser_public_key_schnorr(P)
+keypair = SchnorrKeypair(d)
+d = keypair.private_key
+P = keypair.public_key
+P_ser = keypair.public_key_x_only
 
 # s1
 k1 = 78931426514357468882601520915645133116503184441831846482294115903507660427950
-P1 = multiply(k1)
-if P1[1] % 2 != 0:
-    k1 = n - k1
-    P1 = multiply(k1)
-P1_ser = ser_public_key_schnorr(P1)
+keypair1 = SchnorrKeypair(k1)
+k1 = keypair1.private_key
+P1 = keypair1.public_key
+P1_ser = keypair1.public_key_x_only
 s1 = compact_size(P1_ser) + P1_ser + OP_CHECKSIG
 tapleaf_s1 = tagged_hash("TapLeaf", LEAF_VER + compact_size(s1) + s1)
 
 # s2
 k2 = 53223457762164509281563914254149592059900713682793766747801624337469509007268
-P2 = multiply(k2)
-if P2[1] % 2 != 0:
-    k2 = n - k2
-    P2 = multiply(k2)
-P2_ser = ser_public_key_schnorr(P2)
+keypair2 = SchnorrKeypair(k2)
+k2 = keypair2.private_key
+P2 = keypair2.public_key
+P2_ser = keypair2.public_key_x_only
 s2 = compact_size(P2_ser) + P2_ser + OP_CHECKSIG
 tapleaf_s2 = tagged_hash("TapLeaf", LEAF_VER + compact_size(s2) + s2)
 
 # s3
 k3 = 48034867036800174573932088253129938072033279788016841632941291149515077395801
-P3 = multiply(k3)
-if P3[1] % 2 != 0:
-    k3 = n - k3
-    P3 = multiply(k3)
-P3_ser = ser_public_key_schnorr(P3)
+keypair3 = SchnorrKeypair(k3)
+k3 = keypair3.private_key
+P3 = keypair3.public_key
+P3_ser = keypair3.public_key_x_only
 s3 = compact_size(P3_ser) + P3_ser + OP_CHECKSIG
 tapleaf_s3 = tagged_hash("TapLeaf", LEAF_VER + compact_size(s3) + s3)
 
@@ -137,7 +134,7 @@ address_tapscript = generate_address_P2TR_testnet(Q_ser) # tb1p4mxklg32p85ukf9qr
 # Seleziono una chiave privata k, numero intero fra 0 e n-1, dove n è l'ordine della curva ellittica
 k_dest = 75282383716026770851796771414193474962426130999119568701422782830663027711072
 # Genero la chiave pubblica corrispondente
-K_dest = multiply(k_dest)
+K_dest = pubkey_from_privkey(k_dest)
 # La serializzo nella sua forma compressa
 K_dest_ser = ser_public_key_schnorr(K_dest)
 # Genero l'address di ricezione P2TR collegato a questa coppia di chiavi crittografiche
@@ -254,9 +251,11 @@ input_index = bytes_from_int_reversed(0, NUM_BYTES_4)
 #                  signature opcode, with the value in little endian (or 0xffffffff if none executed).
 scrip_path_used = tapleaf_s1 + b'\x00' + bytes.fromhex("ffffffff")
 
-tx_to_be_signed = b'\x00' + hash_type + version + locktime + sha_prevouts + sha_amounts + sha_scriptpubkeys\
-                  + sha_sequences + sha_outputs + spend_type + input_index\
-                  + scrip_path_used # first element is b'\x00' which is epoch 0
+# first element is b'\x00' which is epoch 0
+tx_to_be_signed = TxWriter()\
+    .write(b'\x00', hash_type, version, locktime, sha_prevouts, sha_amounts, sha_scriptpubkeys, sha_sequences)\
+    .write(sha_outputs, spend_type, input_index, scrip_path_used)\
+    .getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -268,7 +267,7 @@ tx_to_be_signed = b'\x00' + hash_type + version + locktime + sha_prevouts + sha_
 tx_hash = tagged_hash("TapSighash", tx_to_be_signed)
 
 # Firmo il messaggio con la chiave privata k, impostando un valore fisso del nonce pari a 100
-signature = sign_schnorr(private_key=k1, msg=tx_hash, k=100)
+signature = sign_schnorr(private_key=keypair1, msg=tx_hash, k=100)
 
 # Schnorr non utilizza l'encoding DER della firma
 # Visto che ho usato SIGHASH_ALL, non devo aggiungere alcun byte extra alla firma
@@ -308,10 +307,7 @@ else:
 # to the root (and then, the tweak), going in bottom-up direction.
 control_block = bytes([LEAF_VER[0] + parity_bit[0]]) + P_ser + tapleaf_s2 + tapleaf_s3
 
-witness = witness_count\
-          + compact_size(signature) + signature\
-          + compact_size(s1) + s1\
-          + compact_size(control_block) + control_block
+witness = TxWriter().write(witness_count).write_var_bytes(signature, s1, control_block).getvalue()
 
 # ------------------------------------------------------------------------------ #
 #
@@ -319,8 +315,10 @@ witness = witness_count\
 #
 # ------------------------------------------------------------------------------ #
 
-tx_signed = version + marker + flag + input_count + txid_reverse + vout + b'\x00' + sequence\
-    + output_count + amount_to_send + len_locking_script_dest + locking_script_dest + witness + locktime
+tx_signed = TxWriter()\
+    .write(version, marker, flag, input_count, txid_reverse, vout, b'\x00', sequence, output_count, amount_to_send)\
+    .write(len_locking_script_dest, locking_script_dest, witness, locktime)\
+    .getvalue()
 
 print(tx_signed.hex())
 